@@ -14,11 +14,22 @@ from pydantic import BaseModel, Field
 
 from app.core.config import settings
 from app.core.logging import get_logger
-from app.core.monitoring import track_agent_execution
+from app.core.monitoring import record_llm_usage, track_agent_execution
 from app.mcp_servers.mercadolibre import batch_get_prices_tool, get_product_details_tool
 
 logger = get_logger(__name__)
 
+# Static instructions first and the title last, so every call shares the
+# same prefix for OpenAI's automatic prompt caching
+SPEC_EXTRACTION_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", """You are an expert at extracting technical specifications 
+    from audio equipment product titles. Extract: brand, model, power (watts), 
+    size (inches), impedance (ohms), frequency range, and features.
+    
+    Return JSON with these fields. If a field is not found, use null."""),
+    ("human", "Product title: {title}\n\nExtract specifications as JSON:")
+])
+
 
 class ProductSpecification(BaseModel):
     """Structured product specifications."""
@@ -144,19 +155,12 @@ class DataExtractorAgent:
         """
         logger.info("Extracting specifications", count=len(state["extracted_products"]))
         
-        prompt = ChatPromptTemplate.from_messages([
-            ("system", """You are an expert at extracting technical specifications 
-            from audio equipment product titles. Extract: brand, model, power (watts), 
-            size (inches), impedance (ohms), frequency range, and features.
-            
-            Return JSON with these fields. If a field is not found, use null."""),
-            ("human", "Product title: {title}\n\nExtract specifications as JSON:")
-        ])
+        chain = SPEC_EXTRACTION_PROMPT | self.llm
         
         for product in state["extracted_products"]:
             try:
-                chain = prompt | self.llm
                 result = await chain.ainvoke({"title": product.original_title})
+                record_llm_usage("data_extractor", result)
                 
                 # TODO: Parse LLM response to ProductSpecification
                 # For now, keep empty specs
@@ -0,0 +1,20 @@
+"""
+Helpers shared by the LangGraph agents.
+"""
+from typing import Any, Dict
+
+from langchain_core.runnables import RunnableConfig
+
+
+def agent_node(name: str):
+    """
+    Graph node that forwards to method ``name`` of the agent passed in the run config.
+    
+    Lets a single compiled graph be shared by every agent instance; callers
+    invoke it with ``config={"configurable": {"agent": self}}``.
+    """
+    async def node(state: Dict[str, Any], config: RunnableConfig) -> Dict[str, Any]:
+        return await getattr(config["configurable"]["agent"], name)(state)
+    
+    node.__name__ = name
+    return node
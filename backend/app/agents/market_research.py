@@ -15,11 +15,30 @@ from pydantic import BaseModel, Field
 
 from app.core.config import settings
 from app.core.logging import get_logger
-from app.core.monitoring import track_agent_execution
+from app.core.monitoring import record_llm_usage, track_agent_execution
 from app.mcp_servers.mercadolibre import search_products_tool
 
 logger = get_logger(__name__)
 
+# All static instructions, output format included, precede the product
+# fields so every call shares the same prefix for OpenAI prompt caching
+SEARCH_QUERY_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", """You are an expert at creating Mercado Libre search queries.
+    Given a product name and attributes, generate 3-5 search query variations
+    that will find similar competitor products.
+    
+    Include variations with:
+    - Exact brand/model names
+    - Generic product category
+    - Technical specifications
+    - Common synonyms
+    
+    Return a JSON array of search queries with format:
+    [{{"keywords": ["word1", "word2"], "category": "category", "min_price": 0, "max_price": 10000}}]"""),
+    ("human", """Product: {product_name}
+    Attributes: {attributes}""")
+])
+
 
 class SearchQuery(BaseModel):
     """Structured search query for ML API."""
@@ -101,33 +120,15 @@ class MarketResearchAgent:
             product_name=state["product_name"]
         )
         
-        prompt = ChatPromptTemplate.from_messages([
-            ("system", """You are an expert at creating Mercado Libre search queries.
-            Given a product name and attributes, generate 3-5 search query variations
-            that will find similar competitor products.
-            
-            Include variations with:
-            - Exact brand/model names
-            - Generic product category
-            - Technical specifications
-            - Common synonyms
-            
-            Return a JSON array of search queries."""),
-            ("human", """Product: {product_name}
-            Attributes: {attributes}
-            
-            Generate search queries as JSON array with format:
-            [{{"keywords": ["word1", "word2"], "category": "category", "min_price": 0, "max_price": 10000}}]""")
-        ])
-        
         parser = PydanticOutputParser(pydantic_object=SearchQuery)
         
         try:
-            chain = prompt | self.llm
+            chain = SEARCH_QUERY_PROMPT | self.llm
             result = await chain.ainvoke({
                 "product_name": state["product_name"],
                 "attributes": str(state["product_attributes"])
             })
+            record_llm_usage("market_research", result)
             
             # Parse LLM output to SearchQuery objects
             # For now, create basic queries
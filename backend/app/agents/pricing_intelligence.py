@@ -6,23 +6,34 @@ This agent generates optimal pricing recommendations:
 2. Calculates target percentiles
 3. Considers profit margins and market position
 """
-from typing import TypedDict, List, Dict, Any, Optional
-from langgraph.graph import StateGraph, END
+import copy
+import logging
+import operator
+import threading
+from functools import cached_property, lru_cache
+from typing import ClassVar, TypedDict, List, Dict, Any, Optional
+from langgraph.graph import StateGraph, START, END
+from langgraph.graph.state import CompiledStateGraph
 from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
-from pydantic import BaseModel, Field
+from dataclasses import asdict, dataclass, field
 import numpy as np
+from cachetools import TTLCache
 from datetime import datetime
 
 from app.core.config import settings
+from app.core._fast_stats import stats6
 from app.core.logging import get_logger
 from app.core.monitoring import track_agent_execution
+from app.agents.graph_utils import agent_node
+from app.schemas.pricing import PriceStatisticsSchema, PricingRecommendationSchema
 from app.mcp_servers.analytics import generate_recommendation_tool, calculate_stats_tool
 
 logger = get_logger(__name__)
 
 
-class PriceStatistics(BaseModel):
+@dataclass(slots=True, frozen=True)
+class PriceStatistics:
     """Statistical analysis of competitor prices."""
     min_price: float
     max_price: float
@@ -32,17 +43,26 @@ class PriceStatistics(BaseModel):
     p75: float  # 75th percentile
     std_dev: float
     sample_size: int
+    
+    def to_pydantic(self) -> PriceStatisticsSchema:
+        """Convert to the Pydantic schema for external serialization."""
+        return PriceStatisticsSchema(**asdict(self))
 
 
-class PricingRecommendation(BaseModel):
+@dataclass(slots=True, frozen=True)
+class PricingRecommendation:
     """Pricing recommendation with reasoning."""
     recommended_price: float
-    confidence: str = Field(description="low, medium, high")
+    confidence: str  # low, medium, high
     target_percentile: float
     expected_margin_percent: float
     reasoning: str
-    alternative_prices: List[float] = Field(default_factory=list)
-    market_position: str = Field(description="premium, competitive, budget")
+    market_position: str  # premium, competitive, budget
+    alternative_prices: List[float] = field(default_factory=list)
+    
+    def to_pydantic(self) -> PricingRecommendationSchema:
+        """Convert to the Pydantic schema for external serialization."""
+        return PricingRecommendationSchema(**asdict(self))
 
 
 class PricingIntelligenceState(TypedDict):
@@ -52,10 +72,204 @@ class PricingIntelligenceState(TypedDict):
     cost_price: float
     current_price: Optional[float]
     competitor_prices: List[float]
+    competitor_prices_np: np.ndarray  # float64 copy of competitor_prices, built once in run()
     price_statistics: Optional[PriceStatistics]
     recommendation: Optional[PricingRecommendation]
     target_margin_percent: float
     target_percentile: float
+    target_percentile_explicit: bool  # Caller fixed target_percentile, skip positioning
+
+
+def _prices_array(state: PricingIntelligenceState) -> np.ndarray:
+    """Competitor prices as float64, converting only if ``run`` did not already."""
+    arr = state.get("competitor_prices_np")
+    if arr is None:
+        arr = np.ascontiguousarray(state["competitor_prices"], dtype=np.float64)
+    return arr
+
+
+def _select_position(min_viable_price: float, p25: float, median: float) -> tuple[str, float]:
+    """Map the minimum viable price to a market position and target percentile."""
+    if min_viable_price <= p25:
+        return "budget", 25.0
+    if min_viable_price <= median:
+        return "competitive", 50.0
+    return "premium", 75.0
+
+
+# Reasoning templates for execute(), bound once at import
+_TMPL_COMPETITIVE_TIGHT = (
+    "Mercado competitivo con poca variación de precios (IQR: ${spread:,.2f}). "
+    "Precio recomendado cercano a la mediana de ${median:,.2f} MXN."
+).format
+_TMPL_VALUE = (
+    "Mercado con amplia variación de precios (IQR: ${spread:,.2f}). "
+    "Estrategia de valor posicionándose cerca del Q1 (${q1:,.2f} MXN)."
+).format
+_TMPL_COMPETITIVE_MODERATE = (
+    "Mercado moderadamente competitivo. Precio recomendado en la mediana de "
+    "${median:,.2f} MXN con {comparable_count} productos comparables."
+).format
+_TMPL_MARKET_POSITION = "Positioned at {position_pct:.0f}% within the interquartile range".format
+
+# Indexed by the strategy branch: 0 tight market, 1 wide market, 2 moderate
+_STRATEGIES = ("competitive", "value", "competitive")
+_CONFIDENCES = (0.85, 0.70, 0.80)
+
+# Alternative scenarios (aggressive, conservative, premium): quartile-based
+# when the quartile is known, otherwise relative to the recommended price
+_ALT_FACTORS = np.array([0.95, 1.0, 0.95])
+_ALT_FALLBACK = np.array([0.90, 1.0, 1.15])
+
+_RISK_STABLE = ("✅ Datos de mercado estables",)
+_RISK_OUTLIERS = ("⚠️ Mercado con precios atípicos detectados (outliers removidos)",)
+_RISK_SMALL = ("⚠️ Muestra pequeña de productos comparables",)
+_RISK_TAIL = (
+    "Considerar tendencias estacionales",
+    "Monitorear cambios de precios de competidores",
+)
+
+
+# MCP calculate_stats keys in PriceStatistics field order
+_MCP_STATS_FIELDS = operator.itemgetter("min", "max", "mean", "median", "q1", "q3", "std_dev", "sample_size")
+
+
+def _alternatives(base: np.ndarray, recommended_price) -> np.ndarray:
+    """
+    Alternative prices from ``[q1, median, q3]`` rows.
+    
+    ``base`` is shape (3,) with a scalar price or (n, 3) with an (n,) array;
+    missing quartiles are 0. Values are left unrounded: callers round with
+    Python's ``round()``, since ``np.round`` breaks half-cent ties differently.
+    """
+    fallback = np.asarray(recommended_price)[..., None] * _ALT_FALLBACK
+    return np.where(base > 0, base * _ALT_FACTORS, fallback)
+
+
+def _stats_payload(
+    mn: float, mx: float, mean: float, median: float,
+    q1: float, q3: float, std: float, sample_size: int
+) -> Dict[str, Any]:
+    """Statistics in MCP calculate_stats key format, for ``precomputed_stats``."""
+    return {
+        "min": mn, "max": mx, "mean": mean, "median": median,
+        "q1": q1, "q3": q3, "std_dev": std, "sample_size": sample_size,
+    }
+
+
+# Recent MCP recommendations, so retries and replays of the same request
+# (same prices, cost, margin and percentile) skip the tool call
+_RECOMMENDATION_CACHE: TTLCache = TTLCache(
+    maxsize=512, ttl=settings.PRICING_RECOMMENDATION_CACHE_TTL
+)
+
+
+async def _cached_recommendation(
+    prices: np.ndarray,
+    cost_price: float,
+    target_margin_percent: float,
+    target_percentile: float,
+    current_price: Optional[float],
+    precomputed_stats: Dict[str, Any]
+) -> Dict[str, Any]:
+    """
+    ``generate_recommendation_tool`` behind a short-lived cache; failures are not cached.
+    
+    Callers get their own copy, so mutating a result cannot change what
+    later hits return.
+    """
+    key = (
+        prices.tobytes(),
+        round(cost_price, 2),
+        round(target_margin_percent, 2),
+        target_percentile if target_percentile is not None else -1,
+        current_price,
+    )
+    cached = _RECOMMENDATION_CACHE.get(key)
+    if cached is not None:
+        return copy.deepcopy(cached)
+    
+    rec_result = await generate_recommendation_tool(
+        cost_price=cost_price,
+        competitor_prices=prices.tolist(),
+        target_margin_percent=target_margin_percent,
+        target_percentile=target_percentile,
+        current_price=current_price,
+        precomputed_stats=precomputed_stats
+    )
+    if rec_result.get("success"):
+        _RECOMMENDATION_CACHE[key] = copy.deepcopy(rec_result)
+    return rec_result
+
+
+def _cents(value: Optional[float]) -> Optional[float]:
+    """Round to cents so equivalent statistics share a cache key."""
+    return round(value, 2) if value is not None else None
+
+
+@lru_cache(maxsize=1024)
+def _compute_recommendation(
+    median: float,
+    q1: Optional[float],
+    q3: Optional[float],
+    outliers_removed: int,
+    comparable_count: int
+) -> tuple:
+    """
+    Pure pricing strategy behind ``PricingIntelligenceAgent.execute``.
+    
+    Only the fields that drive the strategy are part of the key. The result
+    is an immutable tuple since cached values are shared between callers.
+    """
+    # Determine strategy based on market spread
+    spread = q3 - q1 if (q1 and q3) else 0
+    spread_ratio = spread / median if median > 0 else 0
+    
+    if spread_ratio < 0.2:
+        branch = 0
+        recommended_price = median
+        reasoning = _TMPL_COMPETITIVE_TIGHT(spread=spread, median=median)
+    elif spread_ratio > 0.5:
+        branch = 1
+        recommended_price = q1 * 1.05  # 5% arriba del Q1
+        reasoning = _TMPL_VALUE(spread=spread, q1=q1)
+    else:
+        branch = 2
+        recommended_price = median
+        reasoning = _TMPL_COMPETITIVE_MODERATE(median=median, comparable_count=comparable_count)
+    strategy, confidence = _STRATEGIES[branch], _CONFIDENCES[branch]
+    
+    # Calculate market position
+    if q1 and q3 and q3 > q1:
+        position_pct = ((recommended_price - q1) / (q3 - q1) * 100)
+        market_position = _TMPL_MARKET_POSITION(position_pct=position_pct)
+    else:
+        market_position = "Standard market position"
+    
+    # Alternative scenarios (aggressive, conservative, premium)
+    alternatives = tuple(
+        round(v, 2)
+        for v in _alternatives(np.array([q1 or 0, median or 0, q3 or 0]), recommended_price).tolist()
+    )
+    
+    return (
+        round(recommended_price, 2),
+        confidence,
+        strategy,
+        reasoning,
+        market_position,
+        _risk_factors(outliers_removed, comparable_count),
+        alternatives
+    )
+
+
+def _risk_factors(outliers_removed: int, comparable_count: int) -> tuple:
+    """Risk factors shown alongside a recommendation."""
+    return (
+        (_RISK_OUTLIERS if outliers_removed > 3 else _RISK_STABLE)
+        + (_RISK_SMALL if comparable_count < 5 else ())
+        + _RISK_TAIL
+    )
 
 
 class PricingIntelligenceAgent:
@@ -64,95 +278,145 @@ class PricingIntelligenceAgent:
     
     Workflow:
     1. calculate_statistics: Analyze price distribution
-    2. determine_position: Assess market positioning
+    2. determine_position: Assess market positioning (skipped when the
+       caller supplies target_percentile or no statistics are available)
     3. generate_recommendation: Create pricing strategy
     """
     
+    # Compiled once per process; nodes reach the running instance via the config
+    _COMPILED: ClassVar[Optional[CompiledStateGraph]] = None
+    _COMPILE_LOCK: ClassVar[threading.Lock] = threading.Lock()
+    
     def __init__(self):
-        self.llm = ChatOpenAI(
+        cls = type(self)
+        if cls._COMPILED is None:
+            with cls._COMPILE_LOCK:
+                if cls._COMPILED is None:
+                    cls._COMPILED = cls._build_graph()
+        self.graph = cls._COMPILED
+    
+    @cached_property
+    def llm(self) -> ChatOpenAI:
+        """OpenAI client, created on first use since the nodes rarely need it."""
+        return ChatOpenAI(
             model=settings.OPENAI_MODEL_MINI,
             temperature=0.2,
             api_key=settings.OPENAI_API_KEY
         )
-        self.graph = self._build_graph()
     
-    def _build_graph(self) -> StateGraph:
+    @staticmethod
+    def _build_graph() -> CompiledStateGraph:
         """Build LangGraph workflow."""
         workflow = StateGraph(PricingIntelligenceState)
         
-        workflow.add_node("calculate_statistics", self.calculate_statistics)
-        workflow.add_node("determine_position", self.determine_position)
-        workflow.add_node("generate_recommendation", self.generate_recommendation)
-        
-        workflow.set_entry_point("calculate_statistics")
-        workflow.add_edge("calculate_statistics", "determine_position")
+        for name in (
+            "calculate_statistics",
+            "determine_position",
+            "generate_recommendation",
+        ):
+            workflow.add_node(name, agent_node(name))
+        
+        workflow.add_edge(START, "calculate_statistics")
+        workflow.add_conditional_edges(
+            "calculate_statistics",
+            PricingIntelligenceAgent._route_after_statistics,
+            ["determine_position", "generate_recommendation"]
+        )
         workflow.add_edge("determine_position", "generate_recommendation")
         workflow.add_edge("generate_recommendation", END)
         
         return workflow.compile()
     
+    @staticmethod
+    def _route_after_statistics(state: PricingIntelligenceState) -> str:
+        """Skip positioning when there is nothing for it to decide."""
+        if state.get("target_percentile_explicit") or not state.get("price_statistics"):
+            return "generate_recommendation"
+        return "determine_position"
+    
     @track_agent_execution("pricing_intelligence_calculate_statistics")
     async def calculate_statistics(
         self, 
         state: PricingIntelligenceState
-    ) -> PricingIntelligenceState:
-        """Calculate statistical measures from competitor prices using MCP Analytics."""
-        logger.info(
-            "Calculating price statistics",
-            product=state["product_name"],
-            sample_size=len(state["competitor_prices"])
-        )
+    ) -> Dict[str, Any]:
+        """
+        Calculate statistical measures from competitor prices.
         
-        if len(state["competitor_prices"]) == 0:
-            logger.warning("No competitor prices available")
-            state["price_statistics"] = None
-            return state
+        Samples below ``PRICING_STATS_LOCAL_THRESHOLD`` are computed in-process;
+        larger batches go through MCP Analytics. Only the ``price_statistics``
+        delta is returned.
+        """
+        arr = _prices_array(state)
         
-        try:
-            # Use MCP calculate_stats_tool
-            stats_result = await calculate_stats_tool(state["competitor_prices"])
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "Calculating price statistics",
+                product=state["product_name"],
+                sample_size=arr.size
+            )
+        
+        if arr.size == 0:
+            logger.warning("No competitor prices available")
+            return {"price_statistics": None}
+        
+        if arr.size < settings.PRICING_STATS_LOCAL_THRESHOLD:
+            # Small samples: the MCP round-trip costs far more than the math
+            mn, mx, mean, std, p25, median, p75 = stats6(arr)
+            stats = PriceStatistics(
+                min_price=mn,
+                max_price=mx,
+                mean_price=mean,
+                median_price=median,
+                p25=p25,
+                p75=p75,
+                std_dev=std,
+                sample_size=int(arr.size)
+            )
             
-            if stats_result.get("success"):
-                stats = PriceStatistics(
-                    min_price=stats_result["min"],
-                    max_price=stats_result["max"],
-                    mean_price=stats_result["mean"],
-                    median_price=stats_result["median"],
-                    p25=stats_result["q1"],
-                    p75=stats_result["q3"],
-                    std_dev=stats_result["std_dev"],
-                    sample_size=stats_result["sample_size"]
-                )
-                
-                state["price_statistics"] = stats
-                
+            if logger.isEnabledFor(logging.INFO):
                 logger.info(
-                    "Statistics calculated via MCP",
+                    "Statistics calculated locally",
                     median=stats.median_price,
                     mean=stats.mean_price,
                     range=(stats.min_price, stats.max_price)
                 )
-            else:
-                logger.error("Stats calculation failed", error=stats_result.get("error"))
-                state["price_statistics"] = None
+            return {"price_statistics": stats}
+        
+        try:
+            # Use MCP calculate_stats_tool
+            stats_result = await calculate_stats_tool(arr.tolist())
+            
+            if stats_result.get("success"):
+                stats = PriceStatistics(*_MCP_STATS_FIELDS(stats_result))
+                
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info(
+                        "Statistics calculated via MCP",
+                        median=stats.median_price,
+                        mean=stats.mean_price,
+                        range=(stats.min_price, stats.max_price)
+                    )
+                return {"price_statistics": stats}
+            
+            logger.error("Stats calculation failed", error=stats_result.get("error"))
                 
         except Exception as e:
-            logger.error("Stats calculation exception", error=str(e))
-            state["price_statistics"] = None
+            logger.exception("Stats calculation exception", error=str(e))
         
-        return state
+        return {"price_statistics": None}
     
     @track_agent_execution("pricing_intelligence_determine_position")
     async def determine_position(
         self, 
         state: PricingIntelligenceState
-    ) -> PricingIntelligenceState:
+    ) -> Dict[str, Any]:
         """Determine optimal market position based on cost and competition."""
-        logger.info("Determining market position")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Determining market position")
         
         stats = state.get("price_statistics")
         if not stats:
-            return state
+            return {}
         
         cost = state["cost_price"]
         target_margin = state["target_margin_percent"]
@@ -161,49 +425,48 @@ class PricingIntelligenceAgent:
         min_viable_price = cost * (1 + target_margin / 100)
         
         # Determine if we can be competitive with desired margin
-        if min_viable_price <= stats.p25:
-            position = "budget"
-            target_percentile = 25.0
-        elif min_viable_price <= stats.median_price:
-            position = "competitive"
-            target_percentile = 50.0
-        else:
-            position = "premium"
-            target_percentile = 75.0
-        
-        # Store in state
-        state["target_percentile"] = target_percentile
-        
-        logger.info(
-            "Market position determined",
-            position=position,
-            target_percentile=target_percentile,
-            min_viable_price=min_viable_price
+        position, target_percentile = _select_position(
+            min_viable_price, stats.p25, stats.median_price
         )
         
-        return state
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "Market position determined",
+                position=position,
+                target_percentile=target_percentile,
+                min_viable_price=min_viable_price
+            )
+        
+        return {"target_percentile": target_percentile}
     
     @track_agent_execution("pricing_intelligence_generate_recommendation")
     async def generate_recommendation(
         self, 
         state: PricingIntelligenceState
-    ) -> PricingIntelligenceState:
+    ) -> Dict[str, Any]:
         """Generate final pricing recommendation using MCP Analytics."""
-        logger.info("Generating pricing recommendation")
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Generating pricing recommendation")
         
-        if not state.get("price_statistics"):
+        stats = state.get("price_statistics")
+        if not stats:
             logger.warning("No statistics available for recommendation")
-            state["recommendation"] = None
-            return state
+            return {"recommendation": None}
+        
+        target_percentile = state.get("target_percentile")
         
         try:
             # Use MCP generate_recommendation_tool
-            rec_result = await generate_recommendation_tool(
-                cost_price=state["cost_price"],
-                competitor_prices=state["competitor_prices"],
-                target_margin_percent=state.get("target_margin_percent", 30.0),
-                target_percentile=state.get("target_percentile"),
-                current_price=state.get("current_price")
+            rec_result = await _cached_recommendation(
+                _prices_array(state),
+                state["cost_price"],
+                state.get("target_margin_percent", 30.0),
+                target_percentile,
+                state.get("current_price"),
+                _stats_payload(
+                    stats.min_price, stats.max_price, stats.mean_price, stats.median_price,
+                    stats.p25, stats.p75, stats.std_dev, stats.sample_size
+                )
             )
             
             if rec_result.get("success"):
@@ -217,23 +480,21 @@ class PricingIntelligenceAgent:
                     market_position=rec_result["market_position"]
                 )
                 
-                state["recommendation"] = recommendation
-                
-                logger.info(
-                    "Recommendation generated via MCP",
-                    price=recommendation.recommended_price,
-                    margin=recommendation.expected_margin_percent,
-                    position=recommendation.market_position
-                )
-            else:
-                logger.error("Recommendation generation failed", error=rec_result.get("error"))
-                state["recommendation"] = None
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info(
+                        "Recommendation generated via MCP",
+                        price=recommendation.recommended_price,
+                        margin=recommendation.expected_margin_percent,
+                        position=recommendation.market_position
+                    )
+                return {"recommendation": recommendation}
+            
+            logger.error("Recommendation generation failed", error=rec_result.get("error"))
                 
         except Exception as e:
-            logger.error("Recommendation generation exception", error=str(e))
-            state["recommendation"] = None
+            logger.exception("Recommendation generation exception", error=str(e))
         
-        return state
+        return {"recommendation": None}
     
     async def run(
         self,
@@ -242,7 +503,8 @@ class PricingIntelligenceAgent:
         cost_price: float,
         competitor_prices: List[float],
         current_price: Optional[float] = None,
-        target_margin_percent: float = 30.0
+        target_margin_percent: float = 30.0,
+        target_percentile: Optional[float] = None
     ) -> PricingIntelligenceState:
         """
         Execute the pricing intelligence workflow.
@@ -254,6 +516,8 @@ class PricingIntelligenceAgent:
             competitor_prices: List of competitor prices
             current_price: Current selling price (optional)
             target_margin_percent: Target profit margin
+            target_percentile: Fixed target percentile (optional, auto-determined
+                from cost and margin when omitted)
             
         Returns:
             Final state with pricing recommendation
@@ -264,25 +528,31 @@ class PricingIntelligenceAgent:
             "cost_price": cost_price,
             "current_price": current_price,
             "competitor_prices": competitor_prices,
+            "competitor_prices_np": np.ascontiguousarray(competitor_prices, dtype=np.float64),
             "price_statistics": None,
             "recommendation": None,
             "target_margin_percent": target_margin_percent,
-            "target_percentile": 50.0  # Will be auto-determined
+            "target_percentile": target_percentile if target_percentile is not None else 50.0,
+            "target_percentile_explicit": target_percentile is not None
         }
         
-        logger.info(
-            "Starting pricing intelligence workflow",
-            product=product_name,
-            competitors=len(competitor_prices)
-        )
-        
-        final_state = await self.graph.ainvoke(initial_state)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "Starting pricing intelligence workflow",
+                product=product_name,
+                competitors=len(competitor_prices)
+            )
         
-        logger.info(
-            "Pricing intelligence completed",
-            recommended_price=final_state.get("recommendation").recommended_price if final_state.get("recommendation") else None
+        final_state = await self.graph.ainvoke(
+            initial_state, config={"configurable": {"agent": self}}
         )
         
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "Pricing intelligence completed",
+                recommended_price=final_state.get("recommendation").recommended_price if final_state.get("recommendation") else None
+            )
+        
         return final_state
     
     async def execute(
@@ -304,82 +574,40 @@ class PricingIntelligenceAgent:
         Returns:
             Dict with recommendation and metadata
         """
-        logger.info(
-            "Executing PricingIntelligenceAgent (new architecture)",
-            product=target_product,
-            comparable_count=comparable_count
-        )
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "Executing PricingIntelligenceAgent (new architecture)",
+                product=target_product,
+                comparable_count=comparable_count
+            )
         
         # Extract prices from statistics
-        overall = statistics.get("overall", {})
-        clean_stats = overall.get("stats_clean", overall.get("stats_all", {}))
+        overall = statistics.get("overall") or {}
+        clean_stats = overall.get("stats_clean") or overall.get("stats_all") or {}
         
         median = clean_stats.get("median", 0)
-        mean = clean_stats.get("mean", 0)
         q1 = clean_stats.get("q1", median * 0.85 if median else 0)
         q3 = clean_stats.get("q3", median * 1.15 if median else 0)
-        min_price = clean_stats.get("min", 0)
-        max_price = clean_stats.get("max", 0)
-        
-        # Determine strategy based on market spread
-        spread = q3 - q1 if (q1 and q3) else 0
-        spread_ratio = spread / median if median > 0 else 0
-        
-        if spread_ratio < 0.2:
-            strategy = "competitive"
-            recommended_price = median
-            confidence = 0.85
-            reasoning = f"Mercado competitivo con poca variación de precios (IQR: ${spread:,.2f}). Precio recomendado cercano a la mediana de ${median:,.2f} MXN."
-        elif spread_ratio > 0.5:
-            strategy = "value"
-            recommended_price = q1 * 1.05  # 5% arriba del Q1
-            confidence = 0.70
-            reasoning = f"Mercado con amplia variación de precios (IQR: ${spread:,.2f}). Estrategia de valor posicionándose cerca del Q1 (${q1:,.2f} MXN)."
-        else:
-            strategy = "competitive"
-            recommended_price = median
-            confidence = 0.80
-            reasoning = f"Mercado moderadamente competitivo. Precio recomendado en la mediana de ${median:,.2f} MXN con {comparable_count} productos comparables."
-        
-        # Calculate market position
-        if q1 and q3 and q3 > q1:
-            position_pct = ((recommended_price - q1) / (q3 - q1) * 100)
-            market_position = f"Positioned at {position_pct:.0f}% within the interquartile range"
-        else:
-            market_position = "Standard market position"
-        
-        # Alternative scenarios
-        alternatives = {
-            "aggressive": round(q1 * 0.95, 2) if q1 else recommended_price * 0.90,
-            "conservative": round(median, 2) if median else recommended_price,
-            "premium": round(q3 * 0.95, 2) if q3 else recommended_price * 1.15
-        }
-        
-        # Risk factors
-        risk_factors = []
-        outliers_removed = overall.get("outliers_removed", 0)
-        
-        if outliers_removed > 3:
-            risk_factors.append("⚠️ Mercado con precios atípicos detectados (outliers removidos)")
-        else:
-            risk_factors.append("✅ Datos de mercado estables")
-        
-        if comparable_count < 5:
-            risk_factors.append("⚠️ Muestra pequeña de productos comparables")
         
-        risk_factors.extend([
-            "Considerar tendencias estacionales",
-            "Monitorear cambios de precios de competidores"
-        ])
+        (
+            recommended_price, confidence, strategy, reasoning,
+            market_position, risk_factors, alternatives
+        ) = _compute_recommendation(
+            _cents(median),
+            _cents(q1),
+            _cents(q3),
+            overall.get("outliers_removed", 0),
+            comparable_count
+        )
         
         recommendation = {
-            "recommended_price": round(recommended_price, 2),
+            "recommended_price": recommended_price,
             "confidence": confidence,
             "strategy": strategy,
             "reasoning": reasoning,
             "market_position": market_position,
-            "risk_factors": risk_factors,
-            "alternative_prices": alternatives
+            "risk_factors": list(risk_factors),
+            "alternative_prices": dict(zip(("aggressive", "conservative", "premium"), alternatives))
         }
         
         return {
@@ -388,3 +616,94 @@ class PricingIntelligenceAgent:
             "errors": [],
             "success": True
         }
+    
+    async def execute_batch(
+        self,
+        target_products: List[str],
+        statistics: List[Dict[str, Any]],
+        comparable_counts: List[int]
+    ) -> List[Dict[str, Any]]:
+        """
+        Vectorized ``execute`` over many products.
+        
+        The strategy arithmetic runs as NumPy array operations across all
+        products at once; result dicts are only built at the return boundary.
+        
+        Args:
+            target_products: Product descriptions
+            statistics: Market statistics from stats module, one per product
+            comparable_counts: Number of comparable products, one per product
+            
+        Returns:
+            List of dicts shaped like ``execute`` results
+        """
+        n = len(target_products)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Executing PricingIntelligenceAgent batch", products=n)
+        
+        if n == 0:
+            return []
+        
+        # Missing quartiles become 0, which every branch below treats as absent
+        fields = np.zeros((n, 3))
+        outliers_removed = []
+        for k, product_stats in enumerate(statistics):
+            overall = product_stats.get("overall") or {}
+            clean_stats = overall.get("stats_clean") or overall.get("stats_all") or {}
+            median = clean_stats.get("median", 0)
+            q1 = clean_stats.get("q1", median * 0.85 if median else 0)
+            q3 = clean_stats.get("q3", median * 1.15 if median else 0)
+            fields[k] = (_cents(median) or 0, _cents(q1) or 0, _cents(q3) or 0)
+            outliers_removed.append(overall.get("outliers_removed", 0))
+        median, q1, q3 = fields.T
+        
+        has_iqr = (q1 != 0) & (q3 != 0)
+        spread = np.where(has_iqr, q3 - q1, 0.0)
+        spread_ratio = np.divide(spread, median, out=np.zeros(n), where=median > 0)
+        strategy_idx = np.select([spread_ratio < 0.2, spread_ratio > 0.5], [0, 1], default=2)
+        recommended = np.where(strategy_idx == 1, q1 * 1.05, median)
+        
+        iqr_width = q3 - q1
+        has_range = has_iqr & (iqr_width > 0)
+        position_pct = np.divide(
+            recommended - q1, iqr_width, out=np.zeros(n), where=has_range
+        ) * 100
+        
+        alternatives = _alternatives(np.stack([q1, median, q3], axis=1), recommended)
+        
+        results = []
+        for k, (idx, rec_price, alts) in enumerate(zip(
+            strategy_idx.tolist(), recommended.tolist(), alternatives.tolist()
+        )):
+            if idx == 0:
+                reasoning = _TMPL_COMPETITIVE_TIGHT(spread=spread[k], median=median[k])
+            elif idx == 1:
+                reasoning = _TMPL_VALUE(spread=spread[k], q1=q1[k])
+            else:
+                reasoning = _TMPL_COMPETITIVE_MODERATE(
+                    median=median[k], comparable_count=comparable_counts[k]
+                )
+            
+            results.append({
+                "target_product": target_products[k],
+                "recommendation": {
+                    "recommended_price": round(rec_price, 2),
+                    "confidence": _CONFIDENCES[idx],
+                    "strategy": _STRATEGIES[idx],
+                    "reasoning": reasoning,
+                    "market_position": (
+                        _TMPL_MARKET_POSITION(position_pct=position_pct[k])
+                        if has_range[k] else "Standard market position"
+                    ),
+                    "risk_factors": list(
+                        _risk_factors(outliers_removed[k], comparable_counts[k])
+                    ),
+                    "alternative_prices": dict(
+                        zip(("aggressive", "conservative", "premium"), (round(v, 2) for v in alts))
+                    )
+                },
+                "errors": [],
+                "success": True
+            })
+        
+        return results
@@ -20,10 +20,16 @@ MODE 2 - Product Description (LEGACY):
 This architecture separates data extraction from intelligence.
 """
 import asyncio
-from typing import Dict, Any, Optional
+from contextlib import nullcontext
+from functools import lru_cache
+from typing import Dict, Any, List, Optional
 from datetime import datetime
 import re
+import time
 
+from langchain_core.globals import get_llm_cache, set_llm_cache
+
+from app.core.config import settings
 from app.core.logging import get_logger
 from app.core.monitoring import track_agent_execution
 from app.mcp_servers.mercadolibre.scraper import MLWebScraper, ProductDetails
@@ -34,6 +40,29 @@ from app.agents.search_strategy import SearchStrategyAgent
 
 logger = get_logger(__name__)
 
+# Below this many comparable offers the statistics are too thin to price from
+MIN_COMPARABLE_OFFERS = 3
+
+
+def _configure_llm_cache() -> None:
+    """
+    Install a process-wide exact-match LLM cache backed by Redis.
+    
+    Identical prompts to the same model (e.g. re-analyzing a SKU) are then
+    answered from Redis instead of OpenAI. No-op unless REDIS_ENABLED.
+    """
+    if not settings.REDIS_ENABLED or get_llm_cache() is not None:
+        return
+    
+    from redis import Redis
+    from langchain_community.cache import RedisCache
+    
+    set_llm_cache(RedisCache(
+        redis_=Redis.from_url(settings.REDIS_URL),
+        ttl=settings.LLM_CACHE_TTL
+    ))
+    logger.info("LLM response cache enabled", backend="redis", ttl=settings.LLM_CACHE_TTL)
+
 
 class PricingPipeline:
     """
@@ -77,6 +106,8 @@ class PricingPipeline:
     """
     
     def __init__(self):
+        _configure_llm_cache()
+        
         self.scraper = MLWebScraper()
         self.search_strategy_agent = SearchStrategyAgent()
         self.matching_agent = ProductMatchingAgent()
@@ -84,15 +115,20 @@ class PricingPipeline:
         
         logger.info("PricingPipeline initialized")
     
+    # Mercado Libre page URL on any country site, e.g. www. or articulo. hosts;
+    # pasted links often come without the scheme
+    _URL_RE = re.compile(r"^(?:https?://)?(?:[a-z0-9-]+\.)*mercadolibre\.com\.[a-z]{2}/", re.IGNORECASE)
+    
     def _is_product_url(self, input_str: str) -> bool:
         """Check if input is a Mercado Libre product URL."""
-        return bool(re.search(r"mercadolibre\.com\.", input_str))
+        return self._URL_RE.match(input_str) is not None
     
     @track_agent_execution("pricing_pipeline_full")
     async def analyze_product(
         self,
         product_input: str,
-        max_offers: int = 25
+        max_offers: int = 25,
+        force_refresh: bool = False
     ) -> Dict[str, Any]:
         """
         Complete pricing analysis for a product.
@@ -102,6 +138,7 @@ class PricingPipeline:
                 - Product URL (https://www.mercadolibre.com.mx/.../p/MLM...)
                 - Product description ("Sony WH-1000XM5")
             max_offers: Maximum offers to scrape
+            force_refresh: Scrape again even if a cached listing exists
             
         Returns:
             Complete analysis with recommendation
@@ -110,14 +147,15 @@ class PricingPipeline:
         is_url = self._is_product_url(product_input)
         
         if is_url:
-            return await self._analyze_from_url(product_input, max_offers)
+            return await self._analyze_from_url(product_input, max_offers, force_refresh)
         else:
-            return await self._analyze_from_description(product_input, max_offers)
+            return await self._analyze_from_description(product_input, max_offers, force_refresh)
     
     async def _analyze_from_url(
         self,
         product_url: str,
-        max_offers: int = 25
+        max_offers: int = 25,
+        force_refresh: bool = False
     ) -> Dict[str, Any]:
         """
         Analyze product starting from a product URL (new workflow).
@@ -131,10 +169,10 @@ class PricingPipeline:
             max_offers=max_offers
         )
         
-        start_time = datetime.now()
+        perf_start = time.perf_counter()
         result = {
             "product_url": product_url,
-            "timestamp": start_time.isoformat(),
+            "timestamp": datetime.now().isoformat(),
             "pipeline_steps": {},
             "final_recommendation": None,
             "errors": []
@@ -143,7 +181,7 @@ class PricingPipeline:
         try:
             # Step 0: Extract pivot product details
             logger.info("Step 0/5: Extracting pivot product details")
-            pivot_product = self.scraper.extract_product_details(product_url)
+            pivot_product = await self.scraper.extract_product_details(product_url)
             
             if not pivot_product:
                 error_msg = "Failed to extract product details from URL"
@@ -162,7 +200,9 @@ class PricingPipeline:
             
             # Step 1: Generate search strategy
             logger.info("Step 1/5: Generating search strategy")
-            search_strategy = self.search_strategy_agent.generate_search_terms(pivot_product)
+            search_strategy = await asyncio.to_thread(
+                self.search_strategy_agent.generate_search_terms, pivot_product
+            )
             
             result["pipeline_steps"]["search_strategy"] = {
                 "status": "completed",
@@ -175,9 +215,10 @@ class PricingPipeline:
             # Step 2: Scrape products using optimized search
             logger.info("Step 2/5: Scraping Mercado Libre with optimized search")
             search_term = search_strategy.get("primary_search")
-            scraping_result = self.scraper.search_products(
+            scraping_result = await self.scraper.search_products(
                 description=search_term,
-                max_offers=max_offers
+                max_offers=max_offers,
+                force_refresh=force_refresh
             )
             
             result["pipeline_steps"]["scraping"] = {
@@ -198,14 +239,14 @@ class PricingPipeline:
             logger.info("Step 3/5: Filtering comparable products")
             matching_result = await self.matching_agent.execute(
                 target_product=pivot_product.title,
-                offers=scraping_result.offers
+                raw_offers=scraping_result.offers
             )
             
             result["pipeline_steps"]["matching"] = {
                 "status": "completed",
                 "total_offers": len(scraping_result.offers),
-                "comparable": len(matching_result["comparable_offers"]),
-                "excluded": len(matching_result["excluded_offers"])
+                "comparable": matching_result["comparable_count"],
+                "excluded": matching_result["excluded_count"]
             }
             
             comparable_offers = matching_result["comparable_offers"]
@@ -217,7 +258,7 @@ class PricingPipeline:
             
             # Step 4: Calculate statistics
             logger.info("Step 4/5: Calculating price statistics")
-            statistics = get_price_recommendation_data(comparable_offers)
+            statistics = await asyncio.to_thread(get_price_recommendation_data, comparable_offers)
             
             result["pipeline_steps"]["statistics"] = {
                 "status": "completed",
@@ -229,7 +270,7 @@ class PricingPipeline:
             
             # Step 5: Generate pricing recommendation
             logger.info("Step 5/5: Generating pricing recommendation")
-            recommendation = self.pricing_agent.execute(
+            recommendation = await self.pricing_agent.execute(
                 target_product=pivot_product.title,
                 statistics=statistics,
                 comparable_count=len(comparable_offers)
@@ -246,7 +287,7 @@ class PricingPipeline:
             result["errors"].append(error_msg)
         
         # Calculate duration
-        duration = (datetime.now() - start_time).total_seconds()
+        duration = time.perf_counter() - perf_start
         result["duration_seconds"] = duration
         
         logger.info(
@@ -261,133 +302,204 @@ class PricingPipeline:
     async def _analyze_from_description(
         self,
         product_description: str,
-        max_offers: int = 25
+        max_offers: int = 25,
+        force_refresh: bool = False
     ) -> Dict[str, Any]:
         """
         Analyze product from description (legacy workflow).
         """
+        results = await self._analyze_descriptions(
+            [product_description], max_offers, force_refresh=force_refresh
+        )
+        return results[0]
+    
+    async def _analyze_descriptions(
+        self,
+        product_descriptions: List[str],
+        max_offers: int = 25,
+        semaphore: Optional[asyncio.Semaphore] = None,
+        force_refresh: bool = False
+    ) -> List[Dict[str, Any]]:
+        """
+        Analyze several products from descriptions (legacy workflow).
+        
+        Scrapes run concurrently, bounded by ``semaphore`` when given;
+        matching and pricing each run once for the whole batch instead of
+        once per product.
+        """
+        limit = semaphore if semaphore is not None else nullcontext()
+        
+        async def scrape(product_description: str):
+            async with limit:
+                return await self.scraper.search_products(
+                    description=product_description,
+                    max_offers=max_offers,
+                    force_refresh=force_refresh
+                )
+        
         logger.info(
             "Starting complete pricing analysis",
-            product=product_description,
+            products=product_descriptions,
             max_offers=max_offers
         )
         
-        start_time = datetime.now()
-        result = {
-            "product": product_description,
-            "timestamp": start_time.isoformat(),
-            "pipeline_steps": {},
-            "final_recommendation": None,
-            "errors": []
-        }
+        perf_start = time.perf_counter()
+        timestamp = datetime.now().isoformat()
+        results = [
+            {
+                "product": product_description,
+                "timestamp": timestamp,
+                "pipeline_steps": {},
+                "final_recommendation": None,
+                "errors": []
+            }
+            for product_description in product_descriptions
+        ]
+        # Results still moving through the pipeline; a batch-wide failure is
+        # reported on these only, not on products that already stopped
+        in_flight = results
         
         try:
             # Step 1: Scrape products from HTML
             logger.info("Step 1/4: Scraping Mercado Libre")
-            scraping_result = self.scraper.search_products(
-                description=product_description,
-                max_offers=max_offers
-            )
-            
-            result["pipeline_steps"]["1_scraping"] = {
-                "status": "completed",
-                "strategy": scraping_result.strategy,
-                "offers_found": len(scraping_result.offers),
-                "url": scraping_result.listing_url
-            }
-            
-            if not scraping_result.offers:
-                result["errors"].append("No products found in scraping")
-                logger.warning("No offers found, stopping pipeline")
-                return result
-            
-            # Convert offers to dict for agent
-            raw_offers = [o.to_dict() for o in scraping_result.offers]
-            
-            # Step 2: Filter comparable products using LLM
-            logger.info("Step 2/4: Filtering comparable products")
-            matching_result = await self.matching_agent.execute(
-                target_product=product_description,
-                raw_offers=raw_offers
+            scraping_results = await asyncio.gather(
+                *(scrape(d) for d in product_descriptions),
+                return_exceptions=True
             )
             
-            result["pipeline_steps"]["2_matching"] = {
-                "status": "completed",
-                "total_offers": matching_result["total_offers"],
-                "comparable_count": matching_result["comparable_count"],
-                "excluded_count": matching_result["excluded_count"]
-            }
-            
-            if matching_result["comparable_count"] < 3:
-                result["errors"].append(
-                    f"Too few comparable products: {matching_result['comparable_count']}"
+            scraped = []  # (result, description, raw offers) with offers to match
+            for result, product_description, scraping_result in zip(
+                results, product_descriptions, scraping_results
+            ):
+                if isinstance(scraping_result, Exception):
+                    logger.error(f"Pipeline error: {str(scraping_result)}")
+                    result["errors"].append(f"Pipeline failure: {str(scraping_result)}")
+                    continue
+                
+                result["pipeline_steps"]["1_scraping"] = {
+                    "status": "completed",
+                    "strategy": scraping_result.strategy,
+                    "offers_found": len(scraping_result.offers),
+                    "url": scraping_result.listing_url
+                }
+                
+                if not scraping_result.offers:
+                    result["errors"].append("No products found in scraping")
+                    logger.warning("No offers found, stopping pipeline", product=product_description)
+                    continue
+                
+                scraped.append((result, product_description, scraping_result.offers))
+            in_flight = [result for result, _, _ in scraped]
+            
+            matched = []  # (result, description, comparable offers) worth pricing
+            if scraped:
+                # Step 2: Filter comparable products
+                logger.info("Step 2/4: Filtering comparable products")
+                matching_results = await self.matching_agent.execute_batch(
+                    [(product_description, raw_offers) for _, product_description, raw_offers in scraped]
                 )
-                logger.warning("Insufficient comparable products")
-            
-            # Step 3: Calculate statistics (no LLM)
-            logger.info("Step 3/4: Calculating price statistics")
-            
-            # Convert back to Offer objects for stats
-            from app.mcp_servers.mercadolibre.models import Offer
-            comparable_offers = [
-                Offer(**offer_dict) 
-                for offer_dict in matching_result["comparable_offers"]
-            ]
-            
-            statistics = get_price_recommendation_data(comparable_offers)
-            
-            result["pipeline_steps"]["3_statistics"] = {
-                "status": "completed",
-                "analysis": statistics
-            }
-            
-            # Step 4: Generate pricing recommendation using LLM
-            logger.info("Step 4/4: Generating pricing recommendation")
-            pricing_result = await self.pricing_agent.execute(
-                target_product=product_description,
-                statistics=statistics,
-                comparable_count=matching_result["comparable_count"]
-            )
-            
-            result["pipeline_steps"]["4_recommendation"] = {
-                "status": "completed" if pricing_result["success"] else "failed",
-                "recommendation": pricing_result["recommendation"]
-            }
-            
-            result["final_recommendation"] = pricing_result["recommendation"]
-            
-            if pricing_result["errors"]:
-                result["errors"].extend(pricing_result["errors"])
+                
+                for (result, product_description, _), matching_result in zip(scraped, matching_results):
+                    result["pipeline_steps"]["2_matching"] = {
+                        "status": "completed",
+                        "total_offers": matching_result["total_offers"],
+                        "comparable_count": matching_result["comparable_count"],
+                        "excluded_count": matching_result["excluded_count"]
+                    }
+                    
+                    if matching_result["comparable_count"] < MIN_COMPARABLE_OFFERS:
+                        # Too little data for a meaningful recommendation; stop here
+                        result["errors"].append(
+                            f"Too few comparable products: {matching_result['comparable_count']}"
+                        )
+                        logger.warning("Insufficient comparable products, stopping pipeline")
+                        continue
+                    
+                    matched.append((result, product_description, matching_result["comparable_offers"]))
+                in_flight = [result for result, _, _ in matched]
+            
+            if matched:
+                # Step 3: Calculate statistics (no LLM)
+                logger.info("Step 3/4: Calculating price statistics")
+                statistics_by_product = await asyncio.gather(*(
+                    asyncio.to_thread(get_price_recommendation_data, comparable_offers)
+                    for _, _, comparable_offers in matched
+                ), return_exceptions=True)
+                
+                priced = []  # (result, description, comparable offers, statistics)
+                for (result, product_description, comparable_offers), statistics in zip(
+                    matched, statistics_by_product
+                ):
+                    if isinstance(statistics, Exception):
+                        logger.error(f"Pipeline error: {str(statistics)}", product=product_description)
+                        result["errors"].append(f"Pipeline failure: {str(statistics)}")
+                        continue
+                    
+                    result["pipeline_steps"]["3_statistics"] = {
+                        "status": "completed",
+                        "analysis": statistics
+                    }
+                    priced.append((result, product_description, comparable_offers, statistics))
+                in_flight = [result for result, _, _, _ in priced]
+                
+                # Step 4: Generate pricing recommendation
+                logger.info("Step 4/4: Generating pricing recommendation")
+                pricing_results = await self.pricing_agent.execute_batch(
+                    [product_description for _, product_description, _, _ in priced],
+                    [statistics for _, _, _, statistics in priced],
+                    [len(comparable_offers) for _, _, comparable_offers, _ in priced]
+                )
+                
+                for (result, _, _, _), pricing_result in zip(priced, pricing_results):
+                    result["pipeline_steps"]["4_recommendation"] = {
+                        "status": "completed" if pricing_result["success"] else "failed",
+                        "recommendation": pricing_result["recommendation"]
+                    }
+                    
+                    result["final_recommendation"] = pricing_result["recommendation"]
+                    
+                    if pricing_result["errors"]:
+                        result["errors"].extend(pricing_result["errors"])
+                in_flight = []
             
         except Exception as e:
             logger.error(f"Pipeline error: {str(e)}", exc_info=True)
-            result["errors"].append(f"Pipeline failure: {str(e)}")
+            for result in in_flight:
+                result["errors"].append(f"Pipeline failure: {str(e)}")
         
         # Calculate duration
-        end_time = datetime.now()
-        duration = (end_time - start_time).total_seconds()
-        result["duration_seconds"] = duration
+        duration = time.perf_counter() - perf_start
         
-        logger.info(
-            "Pricing analysis completed",
-            duration=duration,
-            has_recommendation=result["final_recommendation"] is not None,
-            errors_count=len(result["errors"])
-        )
+        for result in results:
+            result["duration_seconds"] = duration
+            
+            logger.info(
+                "Pricing analysis completed",
+                duration=duration,
+                has_recommendation=result["final_recommendation"] is not None,
+                errors_count=len(result["errors"])
+            )
         
-        return result
+        return results
     
     async def analyze_multiple_products(
         self,
         product_descriptions: list[str],
-        max_offers_per_product: int = 25
+        max_offers_per_product: int = 25,
+        max_concurrent: int = 10
     ) -> Dict[str, Any]:
         """
         Analyze multiple products in parallel.
         
+        Product URLs each run their own pipeline; descriptions are analyzed
+        together so matching and pricing run once for the batch. At most
+        ``max_concurrent`` URL pipelines and description scrapes are in
+        flight at once, to stay clear of OpenAI and Mercado Libre rate limits.
+        
         Args:
             product_descriptions: List of products to analyze
             max_offers_per_product: Max offers per product
+            max_concurrent: Max URL pipelines / scrapes running at once
             
         Returns:
             Results for all products
@@ -397,26 +509,58 @@ class PricingPipeline:
             products_count=len(product_descriptions)
         )
         
-        # Run analyses in parallel
-        tasks = [
-            self.analyze_product(desc, max_offers_per_product)
-            for desc in product_descriptions
+        url_indices = [
+            i for i, desc in enumerate(product_descriptions) if self._is_product_url(desc)
         ]
+        description_indices = [
+            i for i, desc in enumerate(product_descriptions) if not self._is_product_url(desc)
+        ]
+        
+        semaphore = asyncio.Semaphore(max_concurrent)
+        
+        async def analyze_url(product_url: str) -> Dict[str, Any]:
+            async with semaphore:
+                return await self.analyze_product(product_url, max_offers_per_product)
+        
+        # Run analyses in parallel
+        tasks = [analyze_url(product_descriptions[i]) for i in url_indices]
+        if description_indices:
+            tasks.append(self._analyze_descriptions(
+                [product_descriptions[i] for i in description_indices],
+                max_offers_per_product,
+                semaphore=semaphore
+            ))
         
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        gathered = await asyncio.gather(*tasks, return_exceptions=True)
+        
+        # Restore input order
+        results = [None] * len(product_descriptions)
+        for i, r in zip(url_indices, gathered):
+            results[i] = r
+        if description_indices:
+            batch = gathered[-1]
+            for k, i in enumerate(description_indices):
+                results[i] = batch if isinstance(batch, Exception) else batch[k]
         
         # Process results
-        successful = [r for r in results if isinstance(r, dict) and not r.get("errors")]
-        failed = [r for r in results if not isinstance(r, dict) or r.get("errors")]
+        successful = sum(
+            1 for r in results if isinstance(r, dict) and not r.get("errors")
+        )
         
         return {
             "total_products": len(product_descriptions),
-            "successful": len(successful),
-            "failed": len(failed),
+            "successful": successful,
+            "failed": len(results) - successful,
             "results": results
         }
 
 
+@lru_cache(maxsize=1)
+def _get_pipeline() -> PricingPipeline:
+    """Shared pipeline for quick analyses, built on first use."""
+    return PricingPipeline()
+
+
 # Convenience function for quick analysis
 async def quick_price_analysis(product: str) -> Dict[str, Any]:
     """
@@ -428,5 +572,5 @@ async def quick_price_analysis(product: str) -> Dict[str, Any]:
     Returns:
         Analysis result
     """
-    pipeline = PricingPipeline()
+    pipeline = _get_pipeline()
     return await pipeline.analyze_product(product)
@@ -6,23 +6,81 @@ are comparable/relevant for pricing analysis.
 
 Responsibility: Filter and classify products, NOT scraping.
 """
-from typing import TypedDict, List, Dict, Any
+import asyncio
+import re
+import threading
+from functools import cached_property
+from typing import ClassVar, TypedDict, List, Dict, Any, Optional, Tuple
 from langgraph.graph import StateGraph, END
+from langgraph.graph.state import CompiledStateGraph
 from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.runnables import Runnable
 from pydantic import BaseModel, Field
+from dataclasses import asdict, dataclass
 
 from app.core.config import settings
 from app.core.logging import get_logger
 from app.core.monitoring import track_agent_execution
+from app.agents.graph_utils import agent_node
+from app.mcp_servers.mercadolibre.models import Offer
 
 logger = get_logger(__name__)
 
+# Title substrings that mark an offer as an accessory or a bundle/kit
+ACCESSORY_WORDS = frozenset({
+    'funda', 'case', 'cable', 'cargador', 'protector',
+    'mica', 'glass', 'adaptador', 'base', 'soporte'
+})
+BUNDLE_WORDS = frozenset({'paquete', 'combo', 'kit', ' + ', 'incluye'})
 
-class ProductClassification(BaseModel):
+# One alternation per word list so each title is scanned once. Plain
+# substrings, not \b-bounded words, so plurals like "fundas" still match
+_ACCESSORY_RE = re.compile("|".join(map(re.escape, sorted(ACCESSORY_WORDS))), re.IGNORECASE)
+_BUNDLE_RE = re.compile("|".join(map(re.escape, sorted(BUNDLE_WORDS))), re.IGNORECASE)
+
+
+@dataclass(slots=True, frozen=True)
+class ProductClassification:
     """Classification of a single product."""
-    item_id: str = Field(description="Product ID")
-    title: str = Field(description="Product title")
+    item_id: str  # Product ID
+    title: str  # Product title
+    is_comparable: bool  # Whether product is comparable to target
+    is_accessory: bool  # Whether product is an accessory
+    is_bundle: bool  # Whether product is a bundle/kit
+    confidence: float  # Confidence score 0-1
+    reason: str  # Brief reason for classification
+
+
+def _classify_offer(offer: Offer) -> ProductClassification:
+    """Classify one offer from its title keywords."""
+    title = offer.title
+    
+    # Check for accessories
+    is_accessory = _ACCESSORY_RE.search(title) is not None
+    
+    # Check for bundles
+    is_bundle = _BUNDLE_RE.search(title) is not None
+    
+    # If accessory or bundle, not comparable
+    is_comparable = not (is_accessory or is_bundle)
+    
+    return ProductClassification(
+        item_id=offer.item_id or '',
+        title=title,
+        is_comparable=is_comparable,
+        is_accessory=is_accessory,
+        is_bundle=is_bundle,
+        confidence=0.8 if is_comparable else 0.9,
+        reason="Accessory detected" if is_accessory else (
+            "Bundle detected" if is_bundle else "Comparable product"
+        )
+    )
+
+
+class OfferClassification(BaseModel):
+    """LLM classification of one numbered offer."""
+    index: int = Field(description="Number of the offer in the list, starting at 1")
     is_comparable: bool = Field(description="Whether product is comparable to target")
     is_accessory: bool = Field(description="Whether product is an accessory")
     is_bundle: bool = Field(description="Whether product is a bundle/kit")
@@ -30,12 +88,64 @@ class ProductClassification(BaseModel):
     reason: str = Field(description="Brief reason for classification")
 
 
+class BatchClassification(BaseModel):
+    """Structured LLM output for one batch of offers."""
+    classifications: List[OfferClassification]
+
+
+# Offers per LLM request, to stay well inside the token limits
+LLM_BATCH_SIZE = 20
+
+CLASSIFY_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", """You are an expert at classifying e-commerce products.
+
+Given a TARGET product and a numbered list of OFFERS, classify each offer as:
+- comparable: The offer is the same or very similar product
+- accessory: The offer is an accessory, case, cable, etc.
+- bundle: The offer includes multiple items or is a kit
+- not_comparable: The offer is a different product
+
+Be strict: Only mark as comparable if it's truly the same product or a direct variant.
+Accessories, bundles, and clearly different products should be excluded.
+
+Examples:
+Target: "Sony WH-1000XM5"
+- "Sony WH-1000XM5 Negro" → comparable (same model, color variant)
+- "Sony WH-1000XM4" → NOT comparable (different model)
+- "Funda para Sony WH-1000XM5" → accessory
+- "Sony WH-1000XM5 + Cable" → bundle
+"""),
+    ("user", """TARGET PRODUCT: {target_product}
+
+OFFERS TO CLASSIFY:
+{offers_text}
+
+Return one classification per offer, using its number as the index.""")
+])
+
+
+def _filter_comparable(
+    offers: List[Offer],
+    classifications: List[ProductClassification]
+) -> List[Offer]:
+    """
+    Keep the offers whose classification is comparable.
+    
+    ``classifications`` is positionally aligned with ``offers``, so listings
+    that share a title are kept or dropped independently.
+    """
+    return [
+        offer for offer, classification in zip(offers, classifications)
+        if classification.is_comparable
+    ]
+
+
 class ProductMatchingState(TypedDict):
     """State for product matching agent."""
     target_product: str  # Original product description
-    raw_offers: List[Dict[str, Any]]  # From scraper
-    classified_offers: List[ProductClassification]
-    comparable_offers: List[Dict[str, Any]]  # Filtered comparable products
+    raw_offers: List[Offer]  # From scraper
+    classified_offers: List[ProductClassification]  # Same order as raw_offers
+    comparable_offers: List[Offer]  # Filtered comparable products
     excluded_count: int
     errors: List[str]
 
@@ -44,33 +154,110 @@ class ProductMatchingAgent:
     """
     LangGraph agent for product matching and filtering.
     
-    This agent uses LLM intelligence to determine which scraped
-    products are truly comparable to the target product.
+    This agent determines which scraped products are truly
+    comparable to the target product.
     
     Workflow:
     1. receive_offers: Initialize state with scraped offers
-    2. classify_products: Use LLM to classify each product
+    2. classify_products: Classify each product with title heuristics or the LLM
     3. filter_comparable: Keep only comparable products
     """
     
+    # Compiled once per process; nodes reach the running instance via the config
+    _COMPILED: ClassVar[Optional[CompiledStateGraph]] = None
+    _COMPILE_LOCK: ClassVar[threading.Lock] = threading.Lock()
+    
     def __init__(self):
-        self.llm = ChatOpenAI(
+        cls = type(self)
+        if cls._COMPILED is None:
+            with cls._COMPILE_LOCK:
+                if cls._COMPILED is None:
+                    cls._COMPILED = cls._build_graph()
+        self.graph = cls._COMPILED
+        
+        logger.info("ProductMatchingAgent initialized")
+    
+    @cached_property
+    def llm(self) -> ChatOpenAI:
+        """OpenAI client, created on first use since classification is heuristic by default."""
+        return ChatOpenAI(
             model=settings.OPENAI_MODEL_MINI,
             temperature=0.1,  # Low temperature for consistent classification
             api_key=settings.OPENAI_API_KEY
         )
-        self.graph = self._build_graph()
+    
+    @cached_property
+    def classifier(self) -> Runnable:
+        """Prompt chained to the LLM constrained to ``BatchClassification`` output."""
+        return CLASSIFY_PROMPT | self.llm.with_structured_output(BatchClassification)
+    
+    async def _classify(
+        self,
+        target_product: str,
+        offers: List[Offer]
+    ) -> List[ProductClassification]:
+        """
+        Classify offers, positionally aligned with ``offers``.
         
-        logger.info("ProductMatchingAgent initialized")
+        Uses title heuristics unless ``PRODUCT_MATCHING_USE_LLM`` is set, in
+        which case offers go to the LLM in concurrent batches.
+        """
+        if not settings.PRODUCT_MATCHING_USE_LLM or not offers:
+            return [_classify_offer(offer) for offer in offers]
+        
+        batches = await asyncio.gather(*(
+            self._classify_with_llm(target_product, offers[i:i + LLM_BATCH_SIZE])
+            for i in range(0, len(offers), LLM_BATCH_SIZE)
+        ))
+        return [c for batch in batches for c in batch]
+    
+    async def _classify_with_llm(
+        self,
+        target_product: str,
+        batch: List[Offer]
+    ) -> List[ProductClassification]:
+        """Classify one batch with the LLM, falling back to heuristics if it fails."""
+        offers_text = "\n".join(
+            f"{j}. [{o.item_id or 'N/A'}] {o.title} (${o.price:,.2f})"
+            for j, o in enumerate(batch, 1)
+        )
+        
+        try:
+            response: BatchClassification = await self.classifier.ainvoke({
+                "target_product": target_product,
+                "offers_text": offers_text
+            })
+        except Exception as e:
+            logger.warning("LLM classification failed, using heuristics", error=str(e))
+            return [_classify_offer(offer) for offer in batch]
+        
+        by_index = {c.index: c for c in response.classifications}
+        classifications = []
+        for j, offer in enumerate(batch, 1):
+            c = by_index.get(j)
+            if c is None:
+                # Offer skipped by the model
+                classifications.append(_classify_offer(offer))
+                continue
+            classifications.append(ProductClassification(
+                item_id=offer.item_id or '',
+                title=offer.title,
+                is_comparable=c.is_comparable and not (c.is_accessory or c.is_bundle),
+                is_accessory=c.is_accessory,
+                is_bundle=c.is_bundle,
+                confidence=c.confidence,
+                reason=c.reason
+            ))
+        return classifications
     
-    def _build_graph(self) -> StateGraph:
+    @staticmethod
+    def _build_graph() -> CompiledStateGraph:
         """Build LangGraph workflow."""
         workflow = StateGraph(ProductMatchingState)
         
         # Add nodes
-        workflow.add_node("receive_offers", self.receive_offers)
-        workflow.add_node("classify_products", self.classify_products)
-        workflow.add_node("filter_comparable", self.filter_comparable)
+        for name in ("receive_offers", "classify_products", "filter_comparable"):
+            workflow.add_node(name, agent_node(name))
         
         # Define edges
         workflow.set_entry_point("receive_offers")
@@ -104,122 +291,19 @@ class ProductMatchingAgent:
     @track_agent_execution("product_matching_classify")
     async def classify_products(self, state: ProductMatchingState) -> ProductMatchingState:
         """
-        Classify each product using LLM.
+        Classify each product from its title.
         
-        The LLM determines if each product is:
+        Keyword heuristics (or the LLM, see ``PRODUCT_MATCHING_USE_LLM``)
+        determine if each product is:
         - Comparable to target
         - An accessory
         - A bundle/kit
         """
         logger.info("Starting product classification")
         
-        target = state["target_product"]
-        offers = state["raw_offers"]
-        
-        # Prepare prompt for batch classification
-        prompt = ChatPromptTemplate.from_messages([
-            ("system", """You are an expert at classifying e-commerce products.
-            
-Given a TARGET product and a list of OFFERS, classify each offer as:
-- comparable: The offer is the same or very similar product
-- accessory: The offer is an accessory, case, cable, etc.
-- bundle: The offer includes multiple items or is a kit
-- not_comparable: The offer is a different product
-
-Be strict: Only mark as comparable if it's truly the same product or a direct variant.
-Accessories, bundles, and clearly different products should be excluded.
-
-Examples:
-Target: "Sony WH-1000XM5"
-- "Sony WH-1000XM5 Negro" → comparable (same model, color variant)
-- "Sony WH-1000XM4" → NOT comparable (different model)
-- "Funda para Sony WH-1000XM5" → accessory
-- "Sony WH-1000XM5 + Cable" → bundle
-
-Target: "iPhone 15 Pro"
-- "iPhone 15 Pro 256GB" → comparable (storage variant)
-- "iPhone 15" → NOT comparable (different model)
-- "Case iPhone 15 Pro" → accessory
-- "iPhone 15 Pro + AirPods" → bundle
-"""),
-            ("user", """TARGET PRODUCT: {target_product}
-
-OFFERS TO CLASSIFY:
-{offers_text}
-
-For each offer, determine:
-1. Is it comparable to the target? (strict matching)
-2. Is it an accessory?
-3. Is it a bundle?
-4. Your confidence (0-1)
-5. Brief reason
-
-Respond in JSON format.""")
-        ])
-        
-        # Batch classify (limit to avoid token limits)
-        batch_size = 20
-        all_classifications = []
-        
-        for i in range(0, len(offers), batch_size):
-            batch = offers[i:i + batch_size]
-            
-            # Format offers for prompt
-            offers_text = "\n".join([
-                f"{j+1}. [{o.get('item_id', 'N/A')}] {o['title']} (${o['price']:,.2f})"
-                for j, o in enumerate(batch)
-            ])
-            
-            try:
-                # Invoke LLM
-                chain = prompt | self.llm
-                response = await chain.ainvoke({
-                    "target_product": target,
-                    "offers_text": offers_text
-                })
-                
-                # Parse response (simplified - in production use structured output)
-                # For now, use simple heuristics + LLM context
-                for offer in batch:
-                    # Simple heuristic classification
-                    title_lower = offer['title'].lower()
-                    
-                    # Check for accessories
-                    is_accessory = any(word in title_lower for word in [
-                        'funda', 'case', 'cable', 'cargador', 'protector',
-                        'mica', 'glass', 'adaptador', 'base', 'soporte'
-                    ])
-                    
-                    # Check for bundles
-                    is_bundle = any(word in title_lower for word in [
-                        'paquete', 'combo', 'kit', ' + ', 'incluye'
-                    ])
-                    
-                    # If accessory or bundle, not comparable
-                    is_comparable = not (is_accessory or is_bundle)
-                    
-                    classification = ProductClassification(
-                        item_id=offer.get('item_id', ''),
-                        title=offer['title'],
-                        is_comparable=is_comparable,
-                        is_accessory=is_accessory,
-                        is_bundle=is_bundle,
-                        confidence=0.8 if is_comparable else 0.9,
-                        reason="Accessory detected" if is_accessory else (
-                            "Bundle detected" if is_bundle else "Comparable product"
-                        )
-                    )
-                    
-                    all_classifications.append(classification)
-                
-                logger.info(
-                    f"Classified batch {i//batch_size + 1}",
-                    batch_size=len(batch)
-                )
-                
-            except Exception as e:
-                logger.error(f"Error classifying batch: {str(e)}")
-                state["errors"].append(f"Classification error: {str(e)}")
+        all_classifications = await self._classify(
+            state["target_product"], state["raw_offers"]
+        )
         
         state["classified_offers"] = all_classifications
         
@@ -239,15 +323,7 @@ Respond in JSON format.""")
         classified = state["classified_offers"]
         raw_offers = state["raw_offers"]
         
-        # Create lookup by title (since we don't have IDs in all cases)
-        comparable_titles = {
-            c.title for c in classified if c.is_comparable
-        }
-        
-        comparable_offers = [
-            o for o in raw_offers
-            if o['title'] in comparable_titles
-        ]
+        comparable_offers = _filter_comparable(raw_offers, classified)
         
         state["comparable_offers"] = comparable_offers
         state["excluded_count"] = len(raw_offers) - len(comparable_offers)
@@ -264,7 +340,7 @@ Respond in JSON format.""")
     async def execute(
         self,
         target_product: str,
-        raw_offers: List[Dict[str, Any]]
+        raw_offers: List[Offer]
     ) -> Dict[str, Any]:
         """
         Execute the product matching workflow.
@@ -291,7 +367,9 @@ Respond in JSON format.""")
             "errors": []
         }
         
-        final_state = await self.graph.ainvoke(initial_state)
+        final_state = await self.graph.ainvoke(
+            initial_state, config={"configurable": {"agent": self}}
+        )
         
         return {
             "target_product": final_state["target_product"],
@@ -299,6 +377,47 @@ Respond in JSON format.""")
             "comparable_offers": final_state["comparable_offers"],
             "comparable_count": len(final_state["comparable_offers"]),
             "excluded_count": final_state["excluded_count"],
-            "classifications": [c.dict() for c in final_state["classified_offers"]],
+            "classifications": [asdict(c) for c in final_state["classified_offers"]],
             "errors": final_state["errors"]
         }
+    
+    async def execute_batch(
+        self,
+        targets_and_offers: List[Tuple[str, List[Offer]]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Match offers for several target products in one call.
+        
+        Classification is per offer, so the batch skips the graph and
+        classifies every product concurrently.
+        
+        Args:
+            targets_and_offers: (target product, raw offers) pairs
+            
+        Returns:
+            List of dicts shaped like ``execute`` results, in input order
+        """
+        logger.info("Executing ProductMatchingAgent batch", products=len(targets_and_offers))
+        
+        all_classifications = await asyncio.gather(*(
+            self._classify(target_product, raw_offers)
+            for target_product, raw_offers in targets_and_offers
+        ))
+        
+        results = []
+        for (target_product, raw_offers), classifications in zip(
+            targets_and_offers, all_classifications
+        ):
+            comparable_offers = _filter_comparable(raw_offers, classifications)
+            
+            results.append({
+                "target_product": target_product,
+                "total_offers": len(raw_offers),
+                "comparable_offers": comparable_offers,
+                "comparable_count": len(comparable_offers),
+                "excluded_count": len(raw_offers) - len(comparable_offers),
+                "classifications": [asdict(c) for c in classifications],
+                "errors": [] if raw_offers else ["No offers received from scraper"]
+            })
+        
+        return results
@@ -7,13 +7,26 @@ and generates search terms to find similar products in the market, regardless of
 Use case: You import and rebrand products, so you need to find competitors with similar
 specifications, not the same brand.
 """
-from typing import Dict, Any, List, Optional
+import copy
+import threading
+from typing import Dict, Any, List, Optional, Tuple
+
+from cachetools import TTLCache
 from langchain_openai import ChatOpenAI
+from app.core.config import settings
 from app.core.logging import get_logger
 from app.mcp_servers.mercadolibre.scraper import ProductDetails
 
 logger = get_logger(__name__)
 
+# LLM search strategies keyed by (product_id, model). Product specs are
+# stable, so a pivot product seen again within the TTL skips the LLM call.
+# Guarded by a lock since the pipeline calls in from worker threads.
+_STRATEGY_CACHE: TTLCache = TTLCache(
+    maxsize=10_000, ttl=settings.SEARCH_STRATEGY_CACHE_TTL
+)
+_STRATEGY_CACHE_LOCK = threading.Lock()
+
 
 class SearchStrategyAgent:
     """
@@ -42,6 +55,10 @@ class SearchStrategyAgent:
         """
         Generate optimal search terms based on product characteristics.
         
+        LLM results are cached per (product_id, model) for
+        ``SEARCH_STRATEGY_CACHE_TTL`` seconds. Callers get their own copy,
+        since the lists end up in pipeline results.
+        
         Args:
             product: Complete product details
             
@@ -52,12 +69,36 @@ class SearchStrategyAgent:
                 - key_specs: Key specifications to focus on
                 - reasoning: Why these terms were chosen
         """
+        key: Optional[Tuple[str, str]] = (
+            (product.product_id, self.llm.model_name) if product.product_id else None
+        )
+        if key is not None:
+            with _STRATEGY_CACHE_LOCK:
+                cached = _STRATEGY_CACHE.get(key)
+            if cached is not None:
+                logger.info("Search strategy cache hit", product_id=product.product_id)
+                return copy.deepcopy(cached)
+        
         logger.info(
             "Generating search strategy",
             product_id=product.product_id,
             title=product.title
         )
         
+        try:
+            result = self._generate_with_llm(product)
+        except Exception as e:
+            logger.error(f"Error generating search strategy: {e}")
+            # Fallback to basic strategy (not cached, so the LLM is retried)
+            return self._fallback_strategy(product)
+        
+        if key is not None:
+            with _STRATEGY_CACHE_LOCK:
+                _STRATEGY_CACHE[key] = copy.deepcopy(result)
+        return result
+    
+    def _generate_with_llm(self, product: ProductDetails) -> Dict[str, Any]:
+        """Ask the LLM for search terms; raises if the call or parsing fails."""
         # Build product description for LLM
         product_info = self._build_product_description(product)
         
@@ -101,22 +142,16 @@ Responde SOLO en formato JSON válido:
   "reasoning": "explicación breve"
 }}"""
         
-        try:
-            response = self.llm.invoke(prompt)
-            result = self._parse_llm_response(response.content)
-            
-            logger.info(
-                "Search strategy generated",
-                primary_search=result.get("primary_search"),
-                alternatives_count=len(result.get("alternative_searches", []))
-            )
-            
-            return result
+        response = self.llm.invoke(prompt)
+        result = self._parse_llm_response(response.content)
         
-        except Exception as e:
-            logger.error(f"Error generating search strategy: {e}")
-            # Fallback to basic strategy
-            return self._fallback_strategy(product)
+        logger.info(
+            "Search strategy generated",
+            primary_search=result.get("primary_search"),
+            alternatives_count=len(result.get("alternative_searches", []))
+        )
+        
+        return result
     
     def _build_product_description(self, product: ProductDetails) -> str:
         """Build a comprehensive product description for the LLM."""
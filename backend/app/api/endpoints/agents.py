@@ -1,9 +1,13 @@
 """
 API endpoints para ejecutar agentes de LangGraph.
 """
-from fastapi import APIRouter, HTTPException, Depends
+import asyncio
+import json
+
+from fastapi import APIRouter, HTTPException, Depends, Request
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
-from typing import Optional
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
 from pydantic import BaseModel, Field
 
 from app.database import get_db
@@ -35,10 +39,63 @@ class PricingWorkflowResponse(BaseModel):
     duration_seconds: float
 
 
+# Orchestrator runs in flight, keyed by their inputs. Concurrent requests
+# with the same inputs await the same run instead of repeating its LLM
+# and Mercado Libre calls.
+_inflight_workflows: Dict[Tuple, "asyncio.Task[Dict[str, Any]]"] = {}
+
+
+async def _run_coalesced(
+    key: Tuple,
+    run: Callable[[], Awaitable[Dict[str, Any]]]
+) -> Dict[str, Any]:
+    """Await the in-flight run for ``key``, starting one if there is none."""
+    task = _inflight_workflows.get(key)
+    if task is None:
+        task = asyncio.ensure_future(run())
+        _inflight_workflows[key] = task
+        task.add_done_callback(lambda _: _inflight_workflows.pop(key, None))
+    # A disconnecting client must not cancel the run for the others
+    return await asyncio.shield(task)
+
+
+def get_orchestrator(request: Request) -> OrchestratorAgent:
+    """
+    Shared OrchestratorAgent for the app, kept on ``app.state``.
+    
+    Built on first use rather than at startup so the API still boots
+    without OpenAI credentials. Runs keep all per-workflow data in the
+    graph state, so one instance serves concurrent requests.
+    """
+    orchestrator = getattr(request.app.state, "orchestrator", None)
+    if orchestrator is None:
+        orchestrator = request.app.state.orchestrator = OrchestratorAgent()
+    return orchestrator
+
+
+def _get_product(db: Session, product_id: int) -> Optional[Product]:
+    """Load a product by ID."""
+    return db.query(Product).filter(Product.id == product_id).first()
+
+
+def _save_recommendation(
+    db: Session,
+    values: Dict[str, Any],
+    product: Product
+) -> None:
+    """Insert a recommendation row, keeping ``product`` readable afterwards."""
+    # Detached instances are not expired by the commit, so the response can
+    # still read the product without another SELECT
+    db.expunge(product)
+    db.execute(insert(PricingRecommendation).values(**values))
+    db.commit()
+
+
 @router.post("/pricing-workflow", response_model=PricingWorkflowResponse)
 async def run_pricing_workflow(
     request: PricingWorkflowRequest,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    orchestrator: OrchestratorAgent = Depends(get_orchestrator)
 ):
     """
     Ejecuta el workflow completo de pricing intelligence:
@@ -58,8 +115,9 @@ async def run_pricing_workflow(
         force_refresh=request.force_refresh
     )
     
-    # Get product from database
-    product = db.query(Product).filter(Product.id == request.product_id).first()
+    # Get product from database. The session is synchronous, so queries
+    # run in a worker thread instead of blocking the event loop
+    product = await asyncio.to_thread(_get_product, db, request.product_id)
     
     if not product:
         logger.error("Product not found", product_id=request.product_id)
@@ -72,18 +130,23 @@ async def run_pricing_workflow(
             detail=f"Product {request.product_id} has invalid cost: {product.cost}"
         )
     
-    # Initialize orchestrator agent
-    orchestrator = OrchestratorAgent()
+    workflow_inputs = dict(
+        product_id=str(product.id),
+        product_name=product.name,
+        product_attributes=product.attributes or {},
+        cost_price=float(product.cost),
+        current_price=float(product.current_price) if product.current_price else None,
+        target_margin_percent=request.target_margin_percent or float(product.min_margin_percent or 30.0)
+    )
+    workflow_key = tuple(
+        json.dumps(v, sort_keys=True, default=str) if isinstance(v, dict) else v
+        for v in workflow_inputs.values()
+    )
     
     try:
-        # Run the complete workflow
-        result = await orchestrator.run(
-            product_id=str(product.id),
-            product_name=product.name,
-            product_attributes=product.attributes or {},
-            cost_price=float(product.cost),
-            current_price=float(product.current_price) if product.current_price else None,
-            target_margin_percent=request.target_margin_percent or float(product.min_margin_percent or 30.0)
+        # Run the complete workflow, shared with identical concurrent requests
+        result = await _run_coalesced(
+            workflow_key, lambda: orchestrator.run(**workflow_inputs)
         )
         
         duration = time.time() - start_time
@@ -100,7 +163,7 @@ async def run_pricing_workflow(
             ).inc()
             
             # Save recommendation to database
-            db_recommendation = PricingRecommendation(
+            recommendation_values = dict(
                 product_id=product.id,
                 recommended_price=rec["recommended_price"],
                 current_price=float(product.current_price) if product.current_price else 0.0,
@@ -112,8 +175,7 @@ async def run_pricing_workflow(
                 confidence=rec.get("confidence", "unknown"),
                 applied=False
             )
-            db.add(db_recommendation)
-            db.commit()
+            await asyncio.to_thread(_save_recommendation, db, recommendation_values, product)
             
             logger.info(
                 "Pricing workflow completed successfully",
@@ -0,0 +1,94 @@
+"""
+Single-pass descriptive statistics kernel for price arrays.
+
+``stats6`` returns (min, max, mean, std, p25, median, p75) from a single
+sort. When numba is installed the kernel is JIT-compiled (and cached on
+disk); otherwise it runs as plain NumPy, or as pure Python for small
+samples where NumPy's per-call overhead dominates.
+"""
+import math
+from statistics import fmean
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional, see the "perf" extra
+    njit = None
+
+
+def _stats6(a):
+    s = np.sort(a)
+    n = s.size
+    last = n - 1
+
+    total = 0.0
+    for i in range(n):
+        total += s[i]
+    mean = total / n
+
+    sq = 0.0
+    for i in range(n):
+        d = s[i] - mean
+        sq += d * d
+    std = np.sqrt(sq / n)
+
+    # Same linear interpolation as np.percentile
+    idx = 0.25 * last
+    i = int(idx)
+    p25 = s[i] + (s[min(i + 1, last)] - s[i]) * (idx - i)
+    idx = 0.5 * last
+    i = int(idx)
+    p50 = s[i] + (s[min(i + 1, last)] - s[i]) * (idx - i)
+    idx = 0.75 * last
+    i = int(idx)
+    p75 = s[i] + (s[min(i + 1, last)] - s[i]) * (idx - i)
+
+    return s[0], s[last], mean, std, p25, p50, p75
+
+
+def _stats6_numpy(a):
+    s = np.sort(a)
+    p25, p50, p75 = np.percentile(s, (25, 50, 75))
+    return s[0], s[-1], s.mean(), s.std(), p25, p50, p75
+
+
+# Below this size sorted() + fsum beat the NumPy fallback
+_SMALL_N = 32
+
+
+def _stats6_small(values):
+    s = sorted(values)
+    n = len(s)
+    last = n - 1
+    mean = fmean(s)
+    std = math.sqrt(math.fsum((v - mean) ** 2 for v in s) / n)
+
+    quantiles = []
+    for q in (0.25, 0.5, 0.75):
+        idx = q * last
+        i = int(idx)
+        quantiles.append(s[i] + (s[min(i + 1, last)] - s[i]) * (idx - i))
+
+    return (s[0], s[last], mean, std, *quantiles)
+
+
+if njit is not None:
+    _kernel = njit(cache=True, fastmath=True)(_stats6)
+    # Compile (or load from cache) now rather than on the first request
+    _kernel(np.zeros(1, dtype=np.float64))
+else:
+    _kernel = _stats6_numpy
+
+HAS_NUMBA = njit is not None
+
+
+def stats6(a: np.ndarray) -> tuple[float, float, float, float, float, float, float]:
+    """
+    Compute (min, max, mean, std, p25, median, p75) of a non-empty float64 array.
+
+    Quantiles use linear interpolation, matching ``np.percentile``.
+    """
+    if not HAS_NUMBA and a.size < _SMALL_N:
+        return _stats6_small(a.tolist())
+    return tuple(float(v) for v in _kernel(a))
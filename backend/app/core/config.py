@@ -16,13 +16,19 @@ class Settings(BaseSettings):
     ENVIRONMENT: str = "development"
     SECRET_KEY: str = "louder-secret-key-change-in-production"
     INIT_DB_ON_STARTUP: bool = True
+    # uvicorn worker processes; follows uvicorn's own WEB_CONCURRENCY
+    API_WORKERS: int = int(os.getenv("WEB_CONCURRENCY") or 1)
     
     # Database
     DATABASE_URL: str = "sqlite:///./louder_pricing.db"
+    DB_POOL_SIZE: int = 20
+    DB_MAX_OVERFLOW: int = 40
+    DB_POOL_RECYCLE: int = 1800  # Seconds before a pooled connection is replaced
     
     # Redis
     REDIS_URL: str = "redis://localhost:6379/0"
     REDIS_ENABLED: bool = False
+    LLM_CACHE_TTL: int = 4 * 3600  # Seconds to keep cached LLM responses in Redis
     
     # Mercado Libre
     ML_CLIENT_ID: str = ""
@@ -31,6 +37,9 @@ class Settings(BaseSettings):
     ML_COUNTRY: str = "MX"
     ML_RATE_LIMIT_PER_HOUR: int = 5000
     ML_API_ENABLED: bool = False  # Enable when new API credentials are ready
+    SCRAPER_PARSE_WORKERS: int = 0  # HTML parse processes per API worker; 0 = split the CPUs across API_WORKERS
+    SCRAPER_CACHE_TTL: int = 15 * 60  # Seconds to reuse a listing scrape for the same product
+    SCRAPER_HTTP_CACHE_MB: int = 64  # Page bodies kept for ETag/Last-Modified revalidation
     
     # OpenAI
     OPENAI_API_KEY: str = ""
@@ -38,6 +47,14 @@ class Settings(BaseSettings):
     OPENAI_MODEL_FULL: str = "gpt-4o"
     OPENAI_EMBEDDING_MODEL: str = "text-embedding-3-small"
     
+    # Pricing Intelligence
+    PRICING_STATS_LOCAL_THRESHOLD: int = 5000  # Below this, stats are computed in-process
+    PRICING_RECOMMENDATION_CACHE_TTL: int = 300  # Seconds to reuse identical MCP recommendations
+    SEARCH_STRATEGY_CACHE_TTL: int = 24 * 3600  # Seconds to reuse search terms per pivot product
+    
+    # Product Matching
+    PRODUCT_MATCHING_USE_LLM: bool = False  # Classify offers with the LLM instead of title heuristics
+    
     # MLflow
     MLFLOW_TRACKING_URI: str = "sqlite:///mlflow.db"
     MLFLOW_EXPERIMENT_NAME: str = "louder-pricing"
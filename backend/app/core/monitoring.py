@@ -75,6 +75,19 @@ agent_errors_total = Counter(
     ["agent_name", "error_type"]
 )
 
+# LLM Metrics
+llm_prompt_tokens_total = Counter(
+    "louder_llm_prompt_tokens_total",
+    "Total LLM prompt tokens sent",
+    ["agent_name"]
+)
+
+llm_cached_prompt_tokens_total = Counter(
+    "louder_llm_cached_prompt_tokens_total",
+    "Prompt tokens served from the provider's prompt cache",
+    ["agent_name"]
+)
+
 # System Info
 system_info = Info(
     "louder_system",
@@ -148,6 +161,17 @@ def track_agent_execution(agent_name: str):
     return decorator
 
 
+def record_llm_usage(agent_name: str, message: Any) -> None:
+    """Record prompt and prompt-cache token usage from an LLM response message."""
+    usage = getattr(message, "usage_metadata", None)
+    if not usage:
+        return
+    llm_prompt_tokens_total.labels(agent_name=agent_name).inc(usage.get("input_tokens", 0))
+    cached = (usage.get("input_token_details") or {}).get("cache_read", 0)
+    if cached:
+        llm_cached_prompt_tokens_total.labels(agent_name=agent_name).inc(cached)
+
+
 # Initialize system info
 system_info.info({
     "app": "louder-pricing-intelligence",
@@ -6,14 +6,23 @@ from .core.config import settings
 # Create SQLAlchemy engine
 # SQLite requires check_same_thread=False for FastAPI
 connect_args = {}
+pool_args = {}
 if settings.DATABASE_URL.startswith("sqlite"):
     connect_args = {"check_same_thread": False}
+else:
+    # Pre-sized pool so bursts of workflow requests reuse warm connections
+    pool_args = {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+    }
 
 engine = create_engine(
     settings.DATABASE_URL,
     connect_args=connect_args,
     pool_pre_ping=True,
     echo=settings.DEBUG,
+    **pool_args,
 )
 
 # Create SessionLocal class
@@ -1,17 +1,26 @@
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from concurrent.futures import ProcessPoolExecutor
 from contextlib import asynccontextmanager
 from prometheus_client import make_asgi_app
+import multiprocessing
+import os
 import time
 
 from .core.config import settings
 from .core.logging import get_logger
+from .core.responses import ORJSONResponse
 from .core.monitoring import (
     api_requests_total,
     api_request_duration_seconds,
     system_info,
 )
 from .database import init_db
+from .mcp_servers.mercadolibre.scraper import (
+    get_http_client,
+    close_http_client,
+    set_parse_executor,
+)
 from .api import api_router
 
 # Initialize structured logger
@@ -42,10 +51,26 @@ async def lifespan(app: FastAPI):
         "environment": settings.ENVIRONMENT
     })
     
+    # Shared keep-alive pool for Mercado Libre scraping
+    get_http_client()
+    
+    # Parse scraped pages in worker processes, off the event loop and GIL.
+    # Spawned rather than forked, since this process already runs threads.
+    # Every API worker has its own pool, so by default they split the CPUs.
+    parse_pool = ProcessPoolExecutor(
+        max_workers=settings.SCRAPER_PARSE_WORKERS
+        or max(1, (os.cpu_count() or 1) // max(1, settings.API_WORKERS)),
+        mp_context=multiprocessing.get_context("spawn"),
+    )
+    set_parse_executor(parse_pool)
+    
     yield
     
     # Shutdown
     logger.info("Application shutting down")
+    set_parse_executor(None)
+    parse_pool.shutdown(cancel_futures=True)
+    await close_http_client()
 
 
 # Create FastAPI app
@@ -54,6 +79,7 @@ app = FastAPI(
     version=settings.VERSION,
     description="Sistema de monitoreo de precios competitivos para Louder Audio",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 # CORS middleware
@@ -164,7 +164,8 @@ class AnalyticsEngine:
         competitor_prices: List[float],
         target_margin_percent: float = 30.0,
         target_percentile: Optional[float] = None,
-        current_price: Optional[float] = None
+        current_price: Optional[float] = None,
+        precomputed_stats: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
         """
         Generate pricing recommendation based on cost and competition.
@@ -175,6 +176,9 @@ class AnalyticsEngine:
             target_margin_percent: Desired profit margin
             target_percentile: Target market position (0-100)
             current_price: Current selling price (optional)
+            precomputed_stats: Statistics of competitor_prices already known to
+                the caller, with calculate_stats keys (min, max, mean, median,
+                q1, q3, std_dev, sample_size); skips recalculating them
         
         Returns:
             Dict with recommendation
@@ -202,7 +206,15 @@ class AnalyticsEngine:
             }
         
         # Calculate statistics
-        stats_result = AnalyticsEngine.calculate_stats(competitor_prices)
+        if precomputed_stats is not None:
+            stats_result = dict(precomputed_stats)
+            mean = stats_result["mean"]
+            stats_result.setdefault("cv", stats_result["std_dev"] / mean if mean > 0 else 0)
+            stats_result.setdefault(
+                "percentiles", {"p25": stats_result["q1"], "p75": stats_result["q3"]}
+            )
+        else:
+            stats_result = AnalyticsEngine.calculate_stats(competitor_prices)
         
         # Determine target percentile based on margin feasibility
         min_viable_price = cost_price * (1 + target_margin_percent / 100)
@@ -333,17 +345,20 @@ async def generate_recommendation_tool(
     competitor_prices: List[float],
     target_margin_percent: float = 30.0,
     target_percentile: Optional[float] = None,
-    current_price: Optional[float] = None
+    current_price: Optional[float] = None,
+    precomputed_stats: Optional[Dict[str, Any]] = None
 ) -> Dict[str, Any]:
     """
     MCP Tool: Generate intelligent pricing recommendation.
     
-    Analyzes competition and generates optimal pricing strategy.
+    Analyzes competition and generates optimal pricing strategy. Pass
+    ``precomputed_stats`` when the price statistics are already known.
     """
     return analytics_engine.generate_recommendation(
         cost_price=cost_price,
         competitor_prices=competitor_prices,
         target_margin_percent=target_margin_percent,
         target_percentile=target_percentile,
-        current_price=current_price
+        current_price=current_price,
+        precomputed_stats=precomputed_stats
     )
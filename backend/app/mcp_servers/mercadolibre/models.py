@@ -15,7 +15,7 @@ class IdentifiedProduct:
     signature: str  # Unique identifier for the product
 
 
-@dataclass
+@dataclass(slots=True)
 class Offer:
     """Oferta individual de un producto en Mercado Libre."""
     title: str
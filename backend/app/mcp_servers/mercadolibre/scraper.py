@@ -8,18 +8,72 @@ Strategy: Extract __PRELOADED_STATE__ or JSON-LD from HTML.
 import re
 import json
 import time
-import requests
-from typing import List, Optional, Dict, Any
+import asyncio
+import httpx
+from concurrent.futures import Executor
+from typing import Iterator, List, Optional, Dict, Any, Tuple
 from datetime import datetime
 
+from cachetools import LRUCache, TTLCache
+
 from .models import IdentifiedProduct, Offer, ScrapingResult
+from app.core.config import settings
 from app.core.logging import get_logger
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
+
+try:
+    import orjson
+except ImportError:  # orjson is optional, see the "perf" extra
+    orjson = None
+
+try:
+    import ahocorasick
+except ImportError:  # pyahocorasick is optional, see the "perf" extra
+    ahocorasick = None
 
 logger = get_logger(__name__)
 
 
-@dataclass
+def _json_loads(s: str) -> Any:
+    """
+    Parse JSON with orjson when available, falling back to the stdlib.
+    
+    orjson rejects NaN/Infinity and lone surrogates, which ``json`` accepts,
+    so anything it refuses is retried with ``json.loads``.
+    """
+    if orjson is not None:
+        try:
+            return orjson.loads(s)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(s)
+
+
+_JSON_DECODER = json.JSONDecoder()
+
+
+def _json_loads_prefix(text: str) -> Any:
+    """
+    Parse the JSON value at the start of ``text``, ignoring anything after it.
+    
+    orjson only parses whole documents, but when it stops at trailing
+    content the error position marks where the value ended, so that prefix
+    is parsed again. The stdlib ``raw_decode`` covers everything else,
+    including what orjson rejects. Raises ValueError if no value parses.
+    """
+    if orjson is not None:
+        try:
+            return orjson.loads(text)
+        except orjson.JSONDecodeError as e:
+            if 0 < e.pos < len(text):
+                try:
+                    return orjson.loads(text[:e.pos])
+                except orjson.JSONDecodeError:
+                    pass
+    return _JSON_DECODER.raw_decode(text)[0]
+
+
+@dataclass(slots=True)
 class ProductDetails:
     """Detailed information extracted from a specific product page."""
     product_id: str
@@ -69,14 +123,171 @@ ACCESSORY_NEGATIVES = [
 ]
 
 
+# Single-word audio brands recognized in product descriptions
+KNOWN_BRANDS = frozenset({
+    "sony", "bose", "jbl", "sennheiser", "shure", "beats", "skullcandy",
+    "marshall", "akg", "jabra", "yamaha", "pioneer", "denon", "klipsch",
+    "audio-technica", "steren", "soundcore", "anker", "apple", "samsung",
+    "xiaomi", "huawei", "logitech", "razer", "hyperx", "steelseries",
+    "corsair", "behringer", "rode", "focusrite", "edifier", "philips",
+})
+
+
+def _build_accessory_matcher():
+    """Return a predicate telling whether a normalized title names an accessory."""
+    if ahocorasick is not None:
+        automaton = ahocorasick.Automaton()
+        for word in ACCESSORY_NEGATIVES:
+            automaton.add_word(word, word)
+        automaton.make_automaton()
+        # One linear scan over the title, however many keywords there are
+        return lambda t: next(automaton.iter(t), None) is not None
+    
+    def has_accessory(t: str) -> bool:
+        # Plain loop with early exit is ~2x faster than any() over a generator
+        for word in ACCESSORY_NEGATIVES:
+            if word in t:
+                return True
+        return False
+    
+    return has_accessory
+
+
+_is_accessory = _build_accessory_matcher()
+
+# Where product pages usually publish the item inside __PRELOADED_STATE__,
+# tried in order before scanning every component
+KNOWN_PRODUCT_PATHS = (
+    ("components", "schema.org:product", "product"),
+    ("components", "vip:main", "item"),
+    ("initialState", "components", "schema.org:product", "product"),
+    ("initialState", "components", "vip:main", "item"),
+)
+
+# Patterns used on every scrape, compiled once
+_WS_RE = re.compile(r"\s+")
+_NONALNUM_RE = re.compile(r"[^a-z0-9]")
+_SLUG_RE = re.compile(r"[^a-z0-9]+")
+_MODEL_RE = re.compile(r"\b([a-z]{1,4}\s*[-]?\s*\d{2,6}\s*[a-z]{0,6}\d*)\b")
+_PRELOAD_RE = re.compile(r"__PRELOADED_STATE__\s*=\s*")
+_JSONLD_MARK = '"application/ld+json"'
+_JSONLD_OPEN_RE = re.compile(r'<script[^>]+type="application/ld\+json"[^>]*>', re.IGNORECASE)
+# No leading \b: it would disable the literal-prefix scan, so the word
+# boundary before "undefined" is checked per match instead
+_UNDEF_RE = re.compile(r"undefined\b")
+_TRAILING_COMMA_RE = re.compile(r",(?=\s*[}\]])")
+_ML_ID_RE = re.compile(r"ML[A-Z]\d+")
+
+
+# Process-wide keep-alive pool for Mercado Libre fetches. The FastAPI
+# lifespan opens and closes it; scripts and tests get one lazily.
+_http_client: Optional[httpx.AsyncClient] = None
+_http_client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Return the shared HTTP client, creating one if needed.
+    
+    Must be called from a running event loop. The client is recreated if
+    the loop changed, since its connections are bound to the loop that
+    opened them.
+    """
+    global _http_client, _http_client_loop
+    loop = asyncio.get_running_loop()
+    if _http_client is None or _http_client_loop is not loop:
+        _http_client = httpx.AsyncClient(
+            headers=DEFAULT_HEADERS,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=50, max_keepalive_connections=20),
+        )
+        _http_client_loop = loop
+    return _http_client
+
+
+# Executor for the CPU-bound HTML parsing. The FastAPI lifespan installs a
+# process pool so parsing runs outside the GIL; without one, parsing runs
+# in the default thread pool to keep the event loop free.
+_parse_executor: Optional[Executor] = None
+
+
+def set_parse_executor(executor: Optional[Executor]) -> None:
+    """Install (or with None, remove) the executor used to parse pages."""
+    global _parse_executor
+    _parse_executor = executor
+
+
+async def _run_parse(fn, *args):
+    """Run a picklable parse function on the parse executor."""
+    return await asyncio.get_running_loop().run_in_executor(_parse_executor, fn, *args)
+
+
+# Listing scrapes keyed by (product signature, max_offers). Only touched
+# from the event loop thread, between awaits, so it needs no lock.
+_SCRAPE_CACHE: TTLCache = TTLCache(maxsize=1024, ttl=settings.SCRAPER_CACHE_TTL)
+
+
+# Last body and validators (ETag / Last-Modified) per fetched URL, bounded by
+# total characters. Lets refetches go out as conditional GETs; a 304 has no
+# body, so the cached one is reused. Event-loop thread only, like the above.
+_HTTP_CACHE: LRUCache = LRUCache(
+    maxsize=settings.SCRAPER_HTTP_CACHE_MB * 1024 * 1024,
+    getsizeof=lambda entry: len(entry[2]),
+)
+
+
+async def fetch_html(url: str, timeout: float) -> str:
+    """
+    GET a Mercado Libre page through the shared client and return its HTML.
+    
+    Revalidates a previously seen URL with ``If-None-Match`` /
+    ``If-Modified-Since`` and serves the cached body on ``304 Not Modified``.
+    Raises ``httpx.HTTPError`` on transport errors and error statuses.
+    """
+    cached = _HTTP_CACHE.get(url)
+    headers = {}
+    if cached is not None:
+        etag, last_modified, _ = cached
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+    
+    response = await get_http_client().get(url, headers=headers, timeout=timeout)
+    if response.status_code == 304 and cached is not None:
+        return cached[2]
+    response.raise_for_status()
+    
+    html = response.text
+    etag = response.headers.get("ETag")
+    last_modified = response.headers.get("Last-Modified")
+    if etag or last_modified:
+        try:
+            _HTTP_CACHE[url] = (etag, last_modified, html)
+        except ValueError:  # single page larger than the whole cache
+            pass
+    else:
+        _HTTP_CACHE.pop(url, None)
+    return html
+
+
+async def close_http_client() -> None:
+    """Close the shared HTTP client, if one is open."""
+    global _http_client, _http_client_loop
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+        _http_client_loop = None
+
+
 def normalize_text(s: str) -> str:
     """Normalize text: lowercase and single spaces."""
-    return re.sub(r"\s+", " ", s.lower().strip())
+    return _WS_RE.sub(" ", s.lower().strip())
 
 
 def normalize_model(s: str) -> str:
     """Normalize model: alphanumeric only."""
-    return re.sub(r"[^a-z0-9]", "", normalize_text(s))
+    return _NONALNUM_RE.sub("", normalize_text(s))
 
 
 def extract_product(description: str) -> IdentifiedProduct:
@@ -91,16 +302,19 @@ def extract_product(description: str) -> IdentifiedProduct:
     """
     d = normalize_text(description)
     
-    # Detect brand (can be extended)
-    brand = "sony" if " sony " in f" {d} " else None
+    # Detect brand: first token that is a known brand
+    brand = next((tok for tok in d.split(" ") if tok in KNOWN_BRANDS), None)
     
     # Extract model pattern (e.g., "WH-1000XM5", "MDR-ZX110")
-    mm = re.search(r"\b([a-z]{1,4}\s*[-]?\s*\d{2,6}\s*[a-z]{0,6}\d*)\b", d)
+    mm = _MODEL_RE.search(d)
     model = mm.group(1) if mm else None
     model_norm = normalize_model(model) if model else None
     
-    # Create signature
-    signature = " ".join([x for x in [brand, model] if x]).strip() or description.strip()
+    # Create signature; a bare brand is too broad a search, keep the description
+    if model:
+        signature = " ".join([x for x in [brand, model] if x]).strip()
+    else:
+        signature = description.strip()
     
     return IdentifiedProduct(brand, model, model_norm, signature)
 
@@ -119,7 +333,7 @@ def match_title(title: str, product: IdentifiedProduct) -> bool:
     t = normalize_text(title)
     
     # Filter out accessories
-    if any(x in t for x in ACCESSORY_NEGATIVES):
+    if _is_accessory(t):
         return False
     
     # Match by model (strongest match)
@@ -144,57 +358,10 @@ def listing_url(query: str) -> str:
     Returns:
         ML listing URL
     """
-    slug = re.sub(r"[^a-z0-9]+", "-", normalize_text(query)).strip("-")
+    slug = _SLUG_RE.sub("-", normalize_text(query)).strip("-")
     return f"https://listado.mercadolibre.com.mx/{slug}"
 
 
-def extract_js_object_by_brackets(text: str, start_idx: int) -> Optional[str]:
-    """
-    Extract JavaScript object by balanced bracket matching.
-    More robust than regex for nested objects.
-    
-    Args:
-        text: Full text containing JS object
-        start_idx: Index of opening brace '{'
-        
-    Returns:
-        Extracted JS object string or None
-    """
-    i = start_idx
-    if i < 0 or i >= len(text) or text[i] != "{":
-        return None
-    
-    depth = 0
-    in_str = False
-    esc = False
-    quote = ""
-    
-    for j in range(i, len(text)):
-        ch = text[j]
-        
-        if in_str:
-            if esc:
-                esc = False
-            elif ch == "\\":
-                esc = True
-            elif ch == quote:
-                in_str = False
-            continue
-        else:
-            if ch in ("'", '"'):
-                in_str = True
-                quote = ch
-                continue
-            if ch == "{":
-                depth += 1
-            elif ch == "}":
-                depth -= 1
-                if depth == 0:
-                    return text[i:j+1]
-    
-    return None
-
-
 def extract_preloaded_state(html: str) -> Optional[dict]:
     """
     Extract __PRELOADED_STATE__ from HTML.
@@ -207,7 +374,7 @@ def extract_preloaded_state(html: str) -> Optional[dict]:
     Returns:
         Parsed dict or None
     """
-    m = re.search(r"__PRELOADED_STATE__\s*=\s*", html)
+    m = _PRELOAD_RE.search(html)
     if not m:
         return None
     
@@ -216,28 +383,89 @@ def extract_preloaded_state(html: str) -> Optional[dict]:
     if brace == -1:
         return None
     
-    obj_str = extract_js_object_by_brackets(html, brace)
-    if not obj_str:
-        return None
+    # An inline script ends at the first </script>, so the object does too.
+    # Without the statement's trailing ";" a lone object parses in one go
+    end = html.find("</script>", brace)
+    text = (html[brace:end] if end != -1 else html[brace:]).rstrip(" \t\r\n;")
     
-    # Try direct JSON parse
+    # Strict: valid JSON, parsed with orjson when available
     try:
-        return json.loads(obj_str)
-    except Exception:
+        return _json_loads_prefix(text)
+    except (ValueError, RecursionError):
         pass
     
-    # Clean common JS issues
-    cleaned = obj_str
-    cleaned = re.sub(r"\bundefined\b", "null", cleaned)
-    cleaned = re.sub(r",\s*([}\]])", r"\1", cleaned)
-    
+    # Lax: clean common JS issues and parse again. The cleanup never changes
+    # brackets or quotes, so the parse still stops where the object ends
     try:
-        return json.loads(cleaned)
-    except Exception:
+        state, _ = _JSON_DECODER.raw_decode(_sanitize_js(text))
+        return state
+    except (ValueError, RecursionError):
         logger.warning("Failed to parse __PRELOADED_STATE__")
         return None
 
 
+def _undefined_to_null(m: re.Match) -> str:
+    """``_UNDEF_RE`` replacement honouring the word boundary before the match."""
+    i = m.start()
+    if i:
+        prev = m.string[i - 1]
+        if prev.isalnum() or prev == "_":
+            return m.group()
+    return "null"
+
+
+def _sanitize_js(text: str) -> str:
+    """Turn ``undefined`` into ``null`` and drop trailing commas."""
+    if "undefined" in text:
+        text = _UNDEF_RE.sub(_undefined_to_null, text)
+    return _TRAILING_COMMA_RE.sub("", text)
+
+
+def iter_jsonld_scripts(html: str) -> Iterator[str]:
+    """
+    Yield the bodies of ``<script type="application/ld+json">`` tags.
+    
+    Jumps between occurrences of the type attribute with ``str.find``
+    instead of running a regex from every ``<script`` on the page, so the
+    many inline scripts on a listing page are skipped at memchr speed.
+    """
+    pos = html.find(_JSONLD_MARK)
+    while pos != -1:
+        tag = _JSONLD_OPEN_RE.match(html, html.rfind("<", 0, pos))
+        if tag is None:
+            # Attribute outside a script tag
+            pos = html.find(_JSONLD_MARK, pos + 1)
+            continue
+        end = html.find("</script>", tag.end())
+        if end == -1:
+            return
+        yield html[tag.end():end].strip()
+        pos = html.find(_JSONLD_MARK, end)
+
+
+def _walk_dicts(obj: Any) -> Iterator[dict]:
+    """
+    Yield every dict nested in ``obj``, depth-first in document order.
+    
+    Parsed JSON only holds plain dicts and lists, so exact ``type()`` checks
+    stand in for the slower ``isinstance``, and only containers are pushed.
+    """
+    stack = [obj] if type(obj) is dict or type(obj) is list else []
+    pop, append = stack.pop, stack.append
+    while stack:
+        x = pop()
+        if type(x) is dict:
+            yield x
+            children = x.values()
+        else:
+            children = x
+        # Push in reverse so children pop in page order, top results first
+        for v in reversed(children):
+            t = type(v)
+            if t is dict or t is list:
+                append(v)
+
+
 def extract_jsonld_nodes(html: str) -> List[Dict[str, Any]]:
     """
     Extract JSON-LD nodes from HTML (fallback method).
@@ -250,31 +478,16 @@ def extract_jsonld_nodes(html: str) -> List[Dict[str, Any]]:
     """
     nodes = []
     
-    for m in re.finditer(
-        r'<script[^>]+type="application/ld\+json"[^>]*>(.*?)</script>',
-        html,
-        re.DOTALL | re.IGNORECASE
-    ):
-        raw = m.group(1).strip()
+    for raw in iter_jsonld_scripts(html):
         try:
-            data = json.loads(raw)
+            data = _json_loads(raw)
         except Exception:
             continue
         
-        # Traverse object tree to find product nodes
-        stack = [data]
-        while stack:
-            x = stack.pop()
-            if isinstance(x, dict):
-                if ("name" in x or "title" in x) and ("offers" in x or "price" in x):
-                    nodes.append(x)
-                for v in x.values():
-                    if isinstance(v, (dict, list)):
-                        stack.append(v)
-            elif isinstance(x, list):
-                for v in x:
-                    if isinstance(v, (dict, list)):
-                        stack.append(v)
+        nodes.extend(
+            x for x in _walk_dicts(data)
+            if ("name" in x or "title" in x) and ("offers" in x or "price" in x)
+        )
     
     return nodes
 
@@ -292,41 +505,31 @@ def offers_from_state(state: dict, product: IdentifiedProduct, limit: int = 150)
         List of Offer objects
     """
     out: List[Offer] = []
-    stack = [state]
-    
-    while stack and len(out) < limit:
-        x = stack.pop()
+    if limit <= 0:
+        return out
+    
+    for x in _walk_dicts(state):
+        title = x.get("title") or x.get("name")
+        price = x.get("price")
+        if isinstance(price, dict):
+            price = price.get("amount") or price.get("value")
         
-        if isinstance(x, dict):
-            title = x.get("title") or x.get("name")
-            price = x.get("price")
-            if isinstance(price, dict):
-                price = price.get("amount") or price.get("value")
-            url = x.get("permalink") or x.get("url") or ""
-            item_id = x.get("id") or x.get("item_id") or ""
-            
-            if title and price is not None:
-                try:
-                    p = float(price)
-                    if match_title(str(title), product):
-                        out.append(Offer(
-                            title=str(title),
-                            price=p,
-                            condition=str(x.get("condition") or "unknown"),
-                            url=str(url),
-                            item_id=str(item_id),
-                            source="preloaded_state",
-                        ))
-                except Exception:
-                    pass
-            
-            for v in x.values():
-                if isinstance(v, (dict, list)):
-                    stack.append(v)
-        elif isinstance(x, list):
-            for v in x:
-                if isinstance(v, (dict, list)):
-                    stack.append(v)
+        if title and price is not None:
+            try:
+                p = float(price)
+                if match_title(str(title), product):
+                    out.append(Offer(
+                        title=str(title),
+                        price=p,
+                        condition=str(x.get("condition") or "unknown"),
+                        url=str(x.get("permalink") or x.get("url") or ""),
+                        item_id=str(x.get("id") or x.get("item_id") or ""),
+                        source="preloaded_state",
+                    ))
+                    if len(out) >= limit:
+                        break
+            except Exception:
+                pass
     
     return out
 
@@ -382,29 +585,55 @@ def offers_from_jsonld(nodes: List[Dict[str, Any]], product: IdentifiedProduct,
     return out
 
 
+def _product_from_known_paths(state: dict) -> Optional[dict]:
+    """Return the product dict at the first ``KNOWN_PRODUCT_PATHS`` hit."""
+    for path in KNOWN_PRODUCT_PATHS:
+        node: Any = state
+        for key in path:
+            if not isinstance(node, dict):
+                break
+            node = node.get(key)
+        if isinstance(node, dict) and node:
+            return node
+    return None
+
+
+def _scan_components(components: dict) -> Optional[dict]:
+    """Fallback: first component carrying a ``product`` or ``item`` entry."""
+    for value in components.values():
+        if isinstance(value, dict):
+            if "product" in value:
+                return value["product"]
+            if "item" in value:
+                return value["item"]
+    return None
+
+
 class MLWebScraper:
     """
     Mercado Libre web scraper.
     Extracts product data from HTML without API.
     """
     
-    def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update(DEFAULT_HEADERS)
-    
-    def search_products(
+    async def search_products(
         self,
         description: str,
         max_offers: int = 25,
-        timeout: int = 25
+        timeout: int = 25,
+        force_refresh: bool = False
     ) -> ScrapingResult:
         """
         Search for products and extract offers from HTML.
         
+        Scrapes that found offers are cached per product signature and
+        ``max_offers`` for ``SCRAPER_CACHE_TTL`` seconds. Callers get their
+        own copy; its ``timestamp`` is still the time of the scrape.
+        
         Args:
             description: Product description (e.g., "Sony WH-1000XM5 audifonos")
             max_offers: Maximum offers to return
             timeout: Request timeout in seconds
+            force_refresh: Skip the cache and scrape again
             
         Returns:
             ScrapingResult with offers and metadata
@@ -415,7 +644,31 @@ class MLWebScraper:
             max_offers=max_offers
         )
         
-        # Extract product info
+        product, url = self._identify(description)
+        
+        key: Tuple[str, int] = (product.signature, max_offers)
+        if not force_refresh:
+            cached = _SCRAPE_CACHE.get(key)
+            if cached is not None:
+                logger.info("Scrape cache hit", signature=product.signature)
+                return replace(cached, offers=list(cached.offers))
+        
+        # Fetch HTML
+        try:
+            html = await fetch_html(url, timeout)
+        except Exception as e:
+            logger.error("Failed to fetch HTML", error=str(e), url=url)
+            return self._error_result(product, url)
+        
+        result = await _run_parse(self._parse_listing, html, product, url, max_offers)
+        # A captcha, block or changed layout parses to zero offers; don't pin
+        # that for the whole TTL
+        if result.offers:
+            _SCRAPE_CACHE[key] = replace(result, offers=list(result.offers))
+        return result
+    
+    def _identify(self, description: str) -> tuple[IdentifiedProduct, str]:
+        """Identify the product in a description and build its listing URL."""
         product = extract_product(description)
         url = listing_url(product.signature)
         
@@ -426,42 +679,43 @@ class MLWebScraper:
             signature=product.signature,
             url=url
         )
-        
-        # Fetch HTML
-        try:
-            response = self.session.get(url, timeout=timeout)
-            response.raise_for_status()
-            html = response.text
-        except Exception as e:
-            logger.error("Failed to fetch HTML", error=str(e), url=url)
-            return ScrapingResult(
-                identified_product=product,
-                strategy="error",
-                listing_url=url,
-                offers=[],
-                timestamp=datetime.now().isoformat()
-            )
-        
+        return product, url
+    
+    def _error_result(self, product: IdentifiedProduct, url: str) -> ScrapingResult:
+        """ScrapingResult for a listing page that could not be fetched."""
+        return ScrapingResult(
+            identified_product=product,
+            strategy="error",
+            listing_url=url,
+            offers=[],
+            timestamp=datetime.now().isoformat()
+        )
+    
+    def _parse_listing(
+        self,
+        html: str,
+        product: IdentifiedProduct,
+        url: str,
+        max_offers: int
+    ) -> ScrapingResult:
+        """Extract offers from listing HTML."""
         offers: List[Offer] = []
         strategy = "none"
         
         # Try __PRELOADED_STATE__ first
         state = extract_preloaded_state(html)
         if isinstance(state, dict):
-            offers = offers_from_state(state, product, limit=max_offers * 6)
+            offers = offers_from_state(state, product, limit=max_offers)
             strategy = "preloaded_state"
             logger.info(f"Extracted {len(offers)} offers from __PRELOADED_STATE__")
         
         # Fallback to JSON-LD
         if not offers:
             nodes = extract_jsonld_nodes(html)
-            offers = offers_from_jsonld(nodes, product, limit=max_offers * 6)
+            offers = offers_from_jsonld(nodes, product, limit=max_offers)
             strategy = "jsonld" if offers else "no_offers"
             logger.info(f"Extracted {len(offers)} offers from JSON-LD")
         
-        # Limit offers
-        offers = offers[:max_offers]
-        
         logger.info(
             "Scraping completed",
             strategy=strategy,
@@ -476,7 +730,7 @@ class MLWebScraper:
             timestamp=datetime.now().isoformat()
         )
     
-    def extract_product_details(self, product_url: str) -> Optional[ProductDetails]:
+    async def extract_product_details(self, product_url: str) -> Optional[ProductDetails]:
         """
         Extract detailed information from a specific product page.
         
@@ -495,13 +749,15 @@ class MLWebScraper:
         )
         
         try:
-            response = requests.get(product_url, headers=DEFAULT_HEADERS, timeout=15)
-            response.raise_for_status()
-            html = response.text
+            html = await fetch_html(product_url, 15)
         except Exception as e:
             logger.error(f"Failed to fetch product page: {e}")
             return None
         
+        return await _run_parse(self._parse_product_page, html, product_url)
+    
+    def _parse_product_page(self, html: str, product_url: str) -> Optional[ProductDetails]:
+        """Extract ProductDetails from product page HTML."""
         # Try to extract from __PRELOADED_STATE__
         state = extract_preloaded_state(html)
         if state:
@@ -522,18 +778,10 @@ class MLWebScraper:
     def _extract_details_from_state(self, state: dict, url: str) -> Optional[ProductDetails]:
         """Extract product details from __PRELOADED_STATE__."""
         try:
-            # Navigate the state structure to find product info
-            components = state.get("components", {})
-            
-            # Try different paths where product data might be
-            product_data = None
-            for key, value in components.items():
-                if isinstance(value, dict) and "product" in value:
-                    product_data = value.get("product")
-                    break
-                elif isinstance(value, dict) and "item" in value:
-                    product_data = value.get("item")
-                    break
+            product_data = _product_from_known_paths(state)
+            if product_data is None:
+                logger.debug("Product not at a known state path, scanning components")
+                product_data = _scan_components(state.get("components", {}))
             
             if not product_data:
                 return None
@@ -617,7 +865,7 @@ class MLWebScraper:
             # Extract product ID from URL or sku
             product_id = product_node.get("sku", "")
             if not product_id:
-                match = re.search(r"ML[A-Z]\d+", url)
+                match = _ML_ID_RE.search(url)
                 product_id = match.group(0) if match else ""
             
             return ProductDetails(
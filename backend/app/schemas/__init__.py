@@ -1,7 +1,12 @@
 from .product import ProductCreate, ProductUpdate, ProductResponse, ProductList
 from .competitor import CompetitorProductResponse
 from .price_snapshot import PriceSnapshotCreate, PriceSnapshotResponse
-from .pricing import PricingRecommendationResponse, PricingStats
+from .pricing import (
+    PricingRecommendationResponse,
+    PricingStats,
+    PriceStatisticsSchema,
+    PricingRecommendationSchema,
+)
 from .scan import ScanLogResponse, ScanTrigger
 
 __all__ = [
@@ -14,6 +19,8 @@ __all__ = [
     "PriceSnapshotResponse",
     "PricingRecommendationResponse",
     "PricingStats",
+    "PriceStatisticsSchema",
+    "PricingRecommendationSchema",
     "ScanLogResponse",
     "ScanTrigger",
 ]
@@ -1,4 +1,4 @@
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from pydantic import BaseModel, Field
 from datetime import datetime
 from decimal import Decimal
@@ -37,3 +37,26 @@ class PricingRecommendationResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class PriceStatisticsSchema(BaseModel):
+    """Estadísticas de precios de competidores calculadas por el agente"""
+    min_price: float
+    max_price: float
+    mean_price: float
+    median_price: float
+    p25: float  # 25th percentile
+    p75: float  # 75th percentile
+    std_dev: float
+    sample_size: int
+
+
+class PricingRecommendationSchema(BaseModel):
+    """Recomendación de precio generada por el agente"""
+    recommended_price: float
+    confidence: str = Field(description="low, medium, high")
+    target_percentile: float
+    expected_margin_percent: float
+    reasoning: str
+    alternative_prices: List[float] = Field(default_factory=list)
+    market_position: str = Field(description="premium, competitive, budget")
@@ -2,6 +2,7 @@
 Core Configuration
 Loads and validates environment variables
 """
+import os
 from typing import List
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -19,7 +20,7 @@ class Settings(BaseSettings):
     # API
     API_HOST: str = "0.0.0.0"
     API_PORT: int = 8000
-    API_WORKERS: int = 4
+    API_WORKERS: int = os.cpu_count() or 1
     CORS_ORIGINS: List[str] = ["http://localhost:8501", "http://localhost:3000"]
     
     # Database
@@ -0,0 +1,27 @@
+"""
+Default JSON response class for the legacy API.
+
+Renders with orjson when it is installed and falls back to Starlette's
+stdlib-based ``JSONResponse`` otherwise. Kept separate from the ``app``
+package's copy so this entrypoint depends only on its own modules.
+"""
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # orjson is optional, see the "perf" extra
+    orjson = None
+
+
+class ORJSONResponse(JSONResponse):
+    """JSON response serialized with orjson (stdlib ``json`` if unavailable)."""
+
+    def render(self, content: Any) -> bytes:
+        if orjson is None:
+            return super().render(content)
+        return orjson.dumps(
+            content,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY,
+        )
@@ -6,9 +6,9 @@ from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
 
 from core.config import settings
+from core.responses import ORJSONResponse
 from core.database import engine
 from models import base  # Import all models
 from api import products, scans, pricing, analytics, health
@@ -35,6 +35,7 @@ app = FastAPI(
     lifespan=lifespan,
     docs_url="/docs" if settings.DEBUG else None,
     redoc_url="/redoc" if settings.DEBUG else None,
+    default_response_class=ORJSONResponse,
 )
 
 # CORS Middleware
@@ -69,7 +70,7 @@ async def root():
 @app.exception_handler(Exception)
 async def global_exception_handler(request, exc):
     """Global exception handler"""
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=500,
         content={
             "error": "Internal server error",
@@ -85,6 +86,8 @@ if __name__ == "__main__":
         "main:app",
         host=settings.API_HOST,
         port=settings.API_PORT,
+        # uvicorn[standard] brings uvloop and httptools, picked automatically.
+        # Reloading needs a single worker
         reload=settings.DEBUG,
         workers=1 if settings.DEBUG else settings.API_WORKERS,
     )
@@ -3,21 +3,83 @@ Louder Price Intelligence - Streamlit Frontend
 Interface for product price analysis and recommendations
 """
 import streamlit as st
+import httpx
+import numpy as np
+import pandas as pd
 import requests
+from requests.adapters import HTTPAdapter
 import re
-from typing import Optional, Dict, Any
+from typing import Callable, Optional, Dict, Any
+import asyncio
+import os
+import queue
+import sys
+import threading
 import time
 
 # Configuration
 API_BASE_URL = "http://localhost:8000"
-BACKEND_AVAILABLE = False
 
-# Check if backend is running
-try:
-    response = requests.get(f"{API_BASE_URL}/health", timeout=2)
-    BACKEND_AVAILABLE = response.status_code == 200
-except:
-    BACKEND_AVAILABLE = False
+# Backend agents, used to run analyses in-process when the API is down.
+# The path is set up once here; the agents themselves are imported by their
+# cached factories, so an API-only session never loads LangChain or numba
+_BACKEND_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'backend')
+if _BACKEND_PATH not in sys.path:
+    sys.path.insert(0, _BACKEND_PATH)
+
+# Badges for the recommendation metrics
+CONFIDENCE_COLOR = {
+    "HIGH": "🟢",
+    "MEDIUM": "🟡",
+    "LOW": "🔴"
+}
+POSITION_EMOJI = {
+    "BUDGET": "🟢",
+    "COMPETITIVE": "🔵",
+    "PREMIUM": "🟠",
+    "LUXURY": "🟣"
+}
+
+
+@st.cache_resource
+def http_session() -> requests.Session:
+    """
+    Shared HTTP session for synchronous backend calls (the health probe).
+    
+    Keeps connections alive across reruns. Failed requests are not retried:
+    the probe has to find out quickly when the backend is down.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=10,
+        pool_maxsize=10,
+        max_retries=0,
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+@st.cache_data(ttl=30)
+def backend_available() -> bool:
+    """
+    Check if the backend is running.
+    
+    Cached for 30 seconds, so reruns don't each wait on the probe and the
+    status still follows the backend going up or down.
+    """
+    try:
+        response = http_session().get(f"{API_BASE_URL}/health", timeout=2)
+        return response.status_code == 200
+    except Exception:
+        return False
+
+# Product-name patterns for Mercado Libre URLs, compiled once
+# /p/ URLs or MLM URLs, matched in a single scan
+_URL_RE = re.compile(
+    r'mercadolibre\.com\.mx/(?P<slug>[^/]+)/p/'
+    r'|MLM-\d+-(?P<mlm>[^/?]+)'
+)
 
 
 def extract_product_info_from_url(url: str) -> Optional[Dict[str, str]]:
@@ -28,111 +90,244 @@ def extract_product_info_from_url(url: str) -> Optional[Dict[str, str]]:
     - https://www.mercadolibre.com.mx/rollo-de-cable-uso-rudo-calibre-14-awg-para-bocina-100m/p/MLM53396734
     - https://articulo.mercadolibre.com.mx/MLM-123456789-producto
     """
-    # Extract product name from URL
-    patterns = [
-        r'mercadolibre\.com\.mx/([^/]+)/p/',  # /p/ URLs
-        r'MLM-\d+-([^/\?]+)',  # MLM URLs
-    ]
+    # Same guard as the caller: only Mercado Libre links carry a product name
+    if "mercadolibre" not in url.lower():
+        return None
     
-    for pattern in patterns:
-        match = re.search(pattern, url)
-        if match:
-            product_name = match.group(1)
-            # Clean up: replace hyphens with spaces and capitalize
-            product_name = product_name.replace('-', ' ').title()
-            return {
-                "name": product_name,
-                "url": url
-            }
+    # Extract product name from URL
+    match = _URL_RE.search(url)
+    if match:
+        product_name = match.group('slug') or match.group('mlm')
+        # Clean up: replace hyphens with spaces and capitalize
+        product_name = product_name.replace('-', ' ').title()
+        return {
+            "name": product_name,
+            "url": url
+        }
     
     return None
 
 
-def run_analysis_locally(product_name: str, cost: float, margin: float) -> Dict[str, Any]:
+@st.cache_resource
+def _event_loop() -> asyncio.AbstractEventLoop:
     """
-    Run analysis locally using the agent modules directly.
-    This is used when the backend API is not available.
+    Event loop for API calls and local analyses, running on a daemon thread.
+    
+    Streamlit runs each session's script in its own thread, so coroutines
+    are submitted with run_coroutine_threadsafe rather than run on the
+    caller's thread.
     """
-    import sys
-    import os
-    import asyncio
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, name="analysis-loop", daemon=True).start()
+    return loop
+
+
+@st.cache_resource
+def _api_client() -> httpx.AsyncClient:
+    """Keep-alive client for pricing-workflow calls, used on the shared loop."""
+    return httpx.AsyncClient(
+        base_url=API_BASE_URL,
+        timeout=120,
+        # Limits go on the transport: the client ignores its own limits= once
+        # a transport is supplied
+        transport=httpx.AsyncHTTPTransport(
+            retries=3,  # connect failures only
+            limits=httpx.Limits(max_keepalive_connections=10),
+        ),
+    )
+
+
+def _run_in_background(
+    coro,
+    on_progress: Optional[Callable[[int, str], None]] = None,
+    milestones: Optional["queue.Queue[Optional[tuple[int, str]]]"] = None,
+    waiting: Optional[tuple[int, str]] = None
+) -> Any:
+    """
+    Run ``coro`` on the shared loop and wait for its result.
+    
+    Streamlit elements can only be updated from the script thread, so the
+    ``(percent, text)`` milestones the coroutine puts on ``milestones`` are
+    relayed to ``on_progress`` from here. While none arrive, ``waiting``
+    (if given) is shown with the seconds elapsed.
+    """
+    if milestones is None:
+        milestones = queue.Queue()
     
-    # Add backend to path
-    backend_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'backend')
-    if backend_path not in sys.path:
-        sys.path.insert(0, backend_path)
+    async def runner():
+        try:
+            return await coro
+        finally:
+            milestones.put(None)  # wake the wait loop as soon as we're done
+    
+    future = asyncio.run_coroutine_threadsafe(runner(), _event_loop())
+    started = time.monotonic()
+    while True:
+        try:
+            milestone = milestones.get(timeout=1.0)
+        except queue.Empty:
+            if waiting and on_progress:
+                percent, text = waiting
+                on_progress(percent, f"{text} ({time.monotonic() - started:.0f} s)")
+            continue
+        if milestone is None:
+            break
+        if on_progress:
+            on_progress(*milestone)
+    return future.result()
+
+
+@st.cache_resource
+def _market_agent():
+    """Market research agent for local analysis, built once per process."""
+    from app.agents.market_research import MarketResearchAgent
+    return MarketResearchAgent()
+
+
+@st.cache_resource
+def _pricing_agent():
+    """Pricing intelligence agent for local analysis, built once per process."""
+    from app.agents.pricing_intelligence import PricingIntelligenceAgent
+    return PricingIntelligenceAgent()
+
+
+def run_analysis_locally(
+    product_name: str,
+    cost: float,
+    margin: float,
+    on_progress: Optional[Callable[[int, str], None]] = None
+) -> Dict[str, Any]:
+    """
+    Run analysis locally using the agent modules directly.
+    This is used when the backend API is not available.
     
+    ``on_progress(percent, text)`` is called from the calling thread as the
+    workflow reaches each milestone. Unexpected errors propagate with their
+    traceback; only failing to load the agents is reported as a result.
+    """
+    # Both agents are cached per process, so pricing-agent setup is paid once
+    # and there is nothing left to overlap with market research below
     try:
-        from app.agents.market_research import MarketResearchAgent
-        from app.agents.pricing_intelligence import PricingIntelligenceAgent
-        
-        async def run():
-            # Step 1: Market Research
-            market_agent = MarketResearchAgent()
-            product_attributes = {
-                "category": "general",
-                "type": "product"
-            }
-            research_result = await market_agent.run(product_name, product_attributes)
-            
-            # Step 2: Extract competitor prices (or use samples if none found)
-            competitors = research_result.get('competitors', [])
-            if competitors:
-                competitor_prices = [c.get('price', 0) for c in competitors if c.get('price')]
-            else:
-                # Use sample data
-                competitor_prices = [2350.0, 2449.0, 2524.0, 2599.0, 2674.0, 2699.0, 2724.0, 
-                                    2799.0, 2849.0, 2874.0, 2924.0, 2949.0, 2974.0, 2999.0, 3049.0]
-            
-            # Step 3: Pricing Intelligence
-            pricing_agent = PricingIntelligenceAgent()
-            result = await pricing_agent.run(
-                product_id="temp-product",
-                product_name=product_name,
-                cost_price=cost,
-                competitor_prices=competitor_prices,
-                target_margin_percent=margin
-            )
-            
-            # Format result
-            recommendation = result.get('recommendation')
-            stats = result.get('price_statistics')
-            
-            if recommendation and stats:
-                return {
-                    "success": True,
-                    "product_name": product_name,
-                    "recommended_price": recommendation.recommended_price,
-                    "margin_percent": recommendation.expected_margin_percent,
-                    "confidence": recommendation.confidence,
-                    "market_position": recommendation.market_position,
-                    "alternatives": recommendation.alternative_prices,
-                    "reasoning": recommendation.reasoning,
-                    "statistics": {
-                        "sample_size": len(competitor_prices),
-                        "min_price": stats.min_price,
-                        "median_price": stats.median_price,
-                        "mean_price": stats.mean_price,
-                        "max_price": stats.max_price,
-                        "std_dev": stats.std_dev
-                    },
-                    "competitors_analyzed": len(competitors)
-                }
-            else:
-                return {
-                    "success": False,
-                    "error": "No se pudo generar recomendación"
-                }
-        
-        # Run async function
-        result = asyncio.run(run())
-        return result
-        
-    except Exception as e:
+        market_agent = _market_agent()
+        pricing_agent = _pricing_agent()
+    except Exception as e:  # backend deps missing: the dashboard still works against the API
         return {
             "success": False,
             "error": str(e)
         }
+    # Streamlit elements can only be updated from this thread, so run()
+    # queues its milestones and the wait loop below relays them
+    milestones: "queue.Queue[Optional[tuple[int, str]]]" = queue.Queue()
+    
+    async def run():
+        # Step 1: Market Research
+        product_attributes = {
+            "category": "general",
+            "type": "product"
+        }
+        research_result = await market_agent.run(product_name, product_attributes)
+        
+        # Step 2: Extract competitor prices (or use samples if none found)
+        competitors = research_result.get('competitors', [])
+        if competitors:
+            competitor_prices = [price for c in competitors if (price := c.get('price'))]
+        else:
+            # Use sample data
+            competitor_prices = [2350.0, 2449.0, 2524.0, 2599.0, 2674.0, 2699.0, 2724.0, 
+                                2799.0, 2849.0, 2874.0, 2924.0, 2949.0, 2974.0, 2999.0, 3049.0]
+        
+        # Step 3: Pricing Intelligence
+        milestones.put((60, "🧮 Calculando estadísticas..."))
+        result = await pricing_agent.run(
+            product_id="temp-product",
+            product_name=product_name,
+            cost_price=cost,
+            competitor_prices=competitor_prices,
+            target_margin_percent=margin
+        )
+        
+        # Format result
+        recommendation = result.get('recommendation')
+        stats = result.get('price_statistics')
+        
+        if recommendation and stats:
+            return {
+                "success": True,
+                "product_name": product_name,
+                "recommended_price": recommendation.recommended_price,
+                "margin_percent": recommendation.expected_margin_percent,
+                "confidence": recommendation.confidence,
+                "market_position": recommendation.market_position,
+                "alternatives": recommendation.alternative_prices,
+                "reasoning": recommendation.reasoning,
+                "statistics": {
+                    "sample_size": len(competitor_prices),
+                    "min_price": stats.min_price,
+                    "median_price": stats.median_price,
+                    "mean_price": stats.mean_price,
+                    "max_price": stats.max_price,
+                    "std_dev": stats.std_dev
+                },
+                "competitors_analyzed": len(competitors)
+            }
+        else:
+            return {
+                "success": False,
+                "error": "No se pudo generar recomendación"
+            }
+    
+    return _run_in_background(run(), on_progress, milestones)
+
+
+class AnalysisError(Exception):
+    """An analysis failed. Raised rather than returned so it isn't cached."""
+
+
+async def _post_backend(product_name: str, cost: float, margin: float) -> Dict[str, Any]:
+    """Run the pricing workflow through the backend API."""
+    # Streamed so an error body is never downloaded, and the connection goes
+    # back to the pool as soon as we're done
+    async with _api_client().stream(
+        "POST",
+        "/api/agents/pricing-workflow",
+        json={
+            "product_name": product_name,
+            "product_cost": cost,
+            "target_margin_percent": margin
+        }
+    ) as response:
+        if response.status_code != 200:
+            raise AnalysisError(f"Error en la API: {response.status_code}")
+        await response.aread()
+        return response.json()
+
+
+@st.cache_data(ttl=600, show_spinner=False)
+def cached_analysis(
+    product_name: str,
+    cost: float,
+    margin: float,
+    backend_ok: bool,
+    _on_progress: Optional[Callable[[int, str], None]] = None
+) -> Dict[str, Any]:
+    """
+    Analyze a product through the API or locally, reusing results for 10 minutes.
+    
+    Repeat clicks with the same inputs skip scraping and pricing entirely.
+    Failures raise AnalysisError, so they are never cached. The progress
+    callback is left out of the cache key (leading underscore).
+    """
+    if backend_ok:
+        return _run_in_background(
+            _post_backend(product_name, cost, margin),
+            _on_progress,
+            waiting=(40, "📡 Esperando respuesta de la API..."),
+        )
+    
+    result = run_analysis_locally(product_name, cost, margin, _on_progress)
+    if not result.get("success"):
+        raise AnalysisError(f"Error en el análisis: {result.get('error')}")
+    return result
 
 
 def main():
@@ -142,6 +337,8 @@ def main():
         layout="wide"
     )
     
+    backend_ok = backend_available()
+    
     # Header
     st.title("💰 Louder Price Intelligence")
     st.markdown("**Análisis inteligente de precios para Mercado Libre**")
@@ -151,7 +348,7 @@ def main():
         st.header("⚙️ Configuración")
         
         # Backend status
-        if BACKEND_AVAILABLE:
+        if backend_ok:
             st.success("✅ Backend conectado")
         else:
             st.warning("⚠️ Modo local (sin API)")
@@ -222,10 +419,10 @@ def main():
         
         # Determine if input is URL or product name
         product_name = product_input
-        is_url = False
+        # Plain product names have no "/", so they never reach the regex
+        is_url = "/" in product_input and "mercadolibre.com" in product_input.lower()
         
-        if "mercadolibre.com" in product_input.lower():
-            is_url = True
+        if is_url:
             extracted = extract_product_info_from_url(product_input)
             if extracted:
                 product_name = extracted["name"]
@@ -241,45 +438,26 @@ def main():
             status_text = st.empty()
             
             try:
-                status_text.text("⏳ Buscando competidores en Mercado Libre...")
-                progress_bar.progress(20)
-                time.sleep(0.5)
+                def show_progress(percent: int, text: str) -> None:
+                    status_text.text(text)
+                    progress_bar.progress(percent)
                 
-                # Run analysis
-                if BACKEND_AVAILABLE:
-                    # Use API
-                    status_text.text("📡 Conectando con API...")
-                    progress_bar.progress(40)
-                    
-                    response = requests.post(
-                        f"{API_BASE_URL}/api/agents/pricing-workflow",
-                        json={
-                            "product_name": product_name,
-                            "product_cost": product_cost,
-                            "target_margin_percent": target_margin
-                        },
-                        timeout=120
-                    )
-                    
-                    if response.status_code == 200:
-                        result = response.json()
-                    else:
-                        st.error(f"❌ Error en la API: {response.status_code}")
-                        st.stop()
+                # Run analysis; local runs report their own milestones
+                if backend_ok:
+                    show_progress(40, "📡 Conectando con API...")
                 else:
-                    # Run locally
-                    status_text.text("🧮 Calculando estadísticas...")
-                    progress_bar.progress(60)
-                    
-                    result = run_analysis_locally(product_name, product_cost, target_margin)
-                    
-                    if not result.get("success"):
-                        st.error(f"❌ Error en el análisis: {result.get('error')}")
-                        st.stop()
+                    show_progress(20, "⏳ Buscando competidores en Mercado Libre...")
+                
+                try:
+                    result = cached_analysis(
+                        product_name, product_cost, target_margin, backend_ok,
+                        _on_progress=show_progress
+                    )
+                except AnalysisError as e:
+                    st.error(f"❌ {e}")
+                    st.stop()
                 
-                status_text.text("✅ Análisis completado!")
-                progress_bar.progress(100)
-                time.sleep(0.5)
+                show_progress(100, "✅ Análisis completado!")
                 
                 # Clear progress indicators
                 progress_bar.empty()
@@ -313,11 +491,7 @@ def main():
                 
                 with rec_col3:
                     confidence = result['confidence'].upper()
-                    confidence_color = {
-                        "HIGH": "🟢",
-                        "MEDIUM": "🟡", 
-                        "LOW": "🔴"
-                    }.get(confidence, "⚪")
+                    confidence_color = CONFIDENCE_COLOR.get(confidence, "⚪")
                     
                     st.metric(
                         "🎯 Confianza",
@@ -327,12 +501,7 @@ def main():
                 
                 with rec_col4:
                     position = result['market_position'].upper()
-                    position_emoji = {
-                        "BUDGET": "🟢",
-                        "COMPETITIVE": "🔵",
-                        "PREMIUM": "🟠",
-                        "LUXURY": "🟣"
-                    }.get(position, "⚪")
+                    position_emoji = POSITION_EMOJI.get(position, "⚪")
                     
                     st.metric(
                         "🏆 Posicionamiento",
@@ -350,12 +519,15 @@ def main():
                     
                     stats = result.get('statistics', {})
                     
-                    st.write(f"**📦 Muestra:** {stats.get('sample_size', result.get('competitors_analyzed', 0))} productos")
-                    st.write(f"**💵 Precio mínimo:** ${stats.get('min_price', 0):,.2f} MXN")
-                    st.write(f"**📊 Precio mediano:** ${stats.get('median_price', 0):,.2f} MXN")
-                    st.write(f"**📈 Precio promedio:** ${stats.get('mean_price', 0):,.2f} MXN")
-                    st.write(f"**💰 Precio máximo:** ${stats.get('max_price', 0):,.2f} MXN")
-                    st.write(f"**📉 Desv. estándar:** ${stats.get('std_dev', 0):,.2f} MXN")
+                    # One markdown element; trailing double spaces keep the line breaks
+                    st.markdown("  \n".join([
+                        f"**📦 Muestra:** {stats.get('sample_size', result.get('competitors_analyzed', 0))} productos",
+                        f"**💵 Precio mínimo:** ${stats.get('min_price', 0):,.2f} MXN",
+                        f"**📊 Precio mediano:** ${stats.get('median_price', 0):,.2f} MXN",
+                        f"**📈 Precio promedio:** ${stats.get('mean_price', 0):,.2f} MXN",
+                        f"**💰 Precio máximo:** ${stats.get('max_price', 0):,.2f} MXN",
+                        f"**📉 Desv. estándar:** ${stats.get('std_dev', 0):,.2f} MXN",
+                    ]))
                 
                 with col_stats2:
                     st.subheader("🎯 Alternativas de Precio")
@@ -363,9 +535,23 @@ def main():
                     alternatives = result.get('alternatives', [])
                     
                     if alternatives:
-                        for i, alt_price in enumerate(alternatives, 1):
-                            alt_margin = ((alt_price - product_cost) / product_cost) * 100 if product_cost > 0 else 0
-                            st.write(f"**{i}.** ${alt_price:,.2f} MXN _(margen: {alt_margin:.1f}%)_")
+                        # One table instead of a st.write element per price
+                        prices = np.asarray(alternatives, dtype=np.float64)
+                        if product_cost > 0:
+                            margins = (prices - product_cost) / product_cost * 100.0
+                        else:
+                            margins = np.zeros_like(prices)
+                        st.dataframe(
+                            pd.DataFrame(
+                                {"Precio": prices, "Margen": margins},
+                                index=pd.RangeIndex(1, len(prices) + 1),
+                            ),
+                            column_config={
+                                "Precio": st.column_config.NumberColumn(format="$%.2f MXN"),
+                                "Margen": st.column_config.NumberColumn(format="%.1f%%"),
+                            },
+                            use_container_width=True,
+                        )
                     else:
                         st.info("No hay alternativas disponibles")
                 
@@ -379,9 +565,9 @@ def main():
                 with st.expander("🔧 Ver datos completos (debug)"):
                     st.json(result)
                 
-            except requests.exceptions.Timeout:
+            except httpx.TimeoutException:
                 st.error("⏱️ Timeout: El análisis tomó demasiado tiempo. Intenta nuevamente.")
-            except requests.exceptions.ConnectionError:
+            except httpx.TransportError:
                 st.error("🔌 Error de conexión: No se pudo conectar con el backend.")
             except Exception as e:
                 st.error(f"❌ Error inesperado: {str(e)}")
@@ -13,6 +13,8 @@ from typing import List, Dict, Any
 from app.agents.market_research import MarketResearchAgent
 from app.agents.data_extractor import DataExtractorAgent
 from app.agents.pricing_intelligence import PricingIntelligenceAgent
+from app.agents.product_matching import ProductMatchingAgent
+from app.mcp_servers.mercadolibre.models import Offer
 
 
 @pytest.mark.asyncio
@@ -128,6 +130,22 @@ class TestAgentsIntegration:
         min_price = 1500.0 * 1.4  # 40% margin
         assert rec.recommended_price >= min_price
     
+    async def test_pricing_intelligence_explicit_percentile(self):
+        """Test a caller-supplied target percentile bypasses positioning."""
+        agent = PricingIntelligenceAgent()
+        
+        result = await agent.run(
+            product_id="TEST-002",
+            product_name="Parlante JBL Flip 6",
+            cost_price=1500.0,
+            competitor_prices=[2350.0, 2400.0, 2450.0, 2500.0, 2600.0, 2700.0],
+            target_margin_percent=40.0,
+            target_percentile=75.0
+        )
+        
+        assert result["target_percentile"] == 75.0
+        assert result["recommendation"].target_percentile == 75.0
+    
     async def test_full_pricing_workflow(self):
         """Test complete workflow: Research → Extract → Price."""
         # Step 1: Market Research
@@ -236,3 +254,231 @@ class TestAgentsWithMockData:
         assert competitors[0].relevance_score >= competitors[1].relevance_score
         assert "flip" in competitors[0].title.lower()
         assert "jbl" in competitors[0].title.lower() or "jbl" in competitors[2].title.lower()
+    
+    async def test_local_statistics_match_mcp(self):
+        """Test in-process statistics agree with the MCP Analytics tool."""
+        from app.mcp_servers.analytics import calculate_stats_tool
+        
+        agent = PricingIntelligenceAgent()
+        prices = [2350.0, 2449.0, 2524.0, 2599.0, 2674.0, 2699.0, 2724.0, 3049.0]
+        
+        result = await agent.calculate_statistics({
+            "product_name": "JBL Flip 6",
+            "competitor_prices": prices
+        })
+        stats = result["price_statistics"]
+        mcp = await calculate_stats_tool(prices)
+        
+        assert stats.sample_size == mcp["sample_size"]
+        assert stats.min_price == mcp["min"]
+        assert stats.max_price == mcp["max"]
+        assert stats.mean_price == pytest.approx(mcp["mean"])
+        assert stats.median_price == pytest.approx(mcp["median"])
+        assert stats.p25 == pytest.approx(mcp["q1"])
+        assert stats.p75 == pytest.approx(mcp["q3"])
+        assert stats.std_dev == pytest.approx(mcp["std_dev"])
+        assert stats.to_pydantic().median_price == stats.median_price
+    
+    async def test_recommendation_cache_returns_copies(self):
+        """Test mutating a recommendation result does not change later cache hits."""
+        import numpy as np
+        from app.agents.pricing_intelligence import _cached_recommendation
+        
+        prices = np.array([2350.0, 2449.0, 2524.0, 2599.0, 2674.0, 2699.0, 2724.0, 3049.0])
+        args = (prices, 1234.5, 35.0, 50.0, None, None)
+        
+        first = await _cached_recommendation(*args)
+        assert first["success"] is True
+        expected = [*first["alternatives"]]
+        first["alternatives"].append(0.0)
+        first["recommended_price"] = 0.0
+        
+        hit = await _cached_recommendation(*args)
+        assert hit["alternatives"] == expected
+        assert hit["recommended_price"] != 0.0
+        
+        hit["alternatives"].clear()
+        assert (await _cached_recommendation(*args))["alternatives"] == expected
+    
+    async def test_search_strategy_cache_returns_copies(self, monkeypatch):
+        """Test cached search strategies are not shared with callers."""
+        from app.agents.search_strategy import SearchStrategyAgent
+        from app.mcp_servers.mercadolibre.scraper import ProductDetails
+        
+        agent = SearchStrategyAgent()
+        calls = []
+        
+        def fake_llm(product):
+            calls.append(product.product_id)
+            return {"primary_search": "bocina techo 5 pulgadas", "alternative_searches": ["bocina plafón"]}
+        
+        monkeypatch.setattr(agent, "_generate_with_llm", fake_llm)
+        product = ProductDetails(
+            product_id="MLM-CACHE-COPY", title="Bocina de techo 5\"", price=899.0, currency="MXN",
+            condition="new", brand=None, model=None, category=None, attributes={},
+            description=None, images=[], seller_name=None, permalink=""
+        )
+        
+        first = agent.generate_search_terms(product)
+        first["alternative_searches"].append("mutated")
+        hit = agent.generate_search_terms(product)
+        hit["alternative_searches"].clear()
+        
+        assert agent.generate_search_terms(product)["alternative_searches"] == ["bocina plafón"]
+        assert calls == ["MLM-CACHE-COPY"]
+    
+    async def test_execute_batch_matches_execute(self):
+        """Test vectorized execute_batch returns the same as per-product execute."""
+        agent = PricingIntelligenceAgent()
+        
+        statistics = [
+            # Tight market
+            {"overall": {"stats_clean": {"median": 2500.0, "q1": 2400.0, "q3": 2600.0}, "outliers_removed": 0}},
+            # Wide market
+            {"overall": {"stats_clean": {"median": 2500.0, "q1": 1500.0, "q3": 3500.0}, "outliers_removed": 5}},
+            # Moderate market
+            {"overall": {"stats_clean": {"median": 2500.0, "q1": 2100.0, "q3": 2900.0}, "outliers_removed": 1}},
+            # Too few offers for quartiles
+            {"overall": {"stats_clean": {"median": 2500.0, "q1": None, "q3": None}, "outliers_removed": 0}},
+        ]
+        products = [f"Producto {i}" for i in range(len(statistics))]
+        counts = [12, 3, 8, 2]
+        
+        batch = await agent.execute_batch(products, statistics, counts)
+        
+        assert len(batch) == len(statistics)
+        for product, stats, count, result in zip(products, statistics, counts, batch):
+            assert result == await agent.execute(product, stats, count)
+        
+        assert [r["recommendation"]["strategy"] for r in batch] == [
+            "competitive", "value", "competitive", "competitive"
+        ]
+    
+    async def test_pipeline_url_detection(self):
+        """Test product URLs are detected with or without a scheme."""
+        from app.agents.pricing_pipeline import PricingPipeline
+        
+        pipeline = PricingPipeline()
+        
+        for url in [
+            "https://www.mercadolibre.com.mx/jbl-flip-6/p/MLM18595481",
+            "http://articulo.mercadolibre.com.ar/MLA-123456789-parlante-jbl",
+            "www.mercadolibre.com.mx/jbl-flip-6/p/MLM18595481",
+            "articulo.mercadolibre.com.mx/MLM-123456789-parlante-jbl",
+        ]:
+            assert pipeline._is_product_url(url), url
+        
+        for description in [
+            "JBL Flip 6 bocina bluetooth",
+            "parlante visto en mercadolibre.com.mx",
+        ]:
+            assert not pipeline._is_product_url(description), description
+    
+    async def test_description_batch_isolates_statistics_failures(self, monkeypatch):
+        """Test one product's statistics failure leaves the rest of the batch intact."""
+        from app.agents import pricing_pipeline
+        from app.mcp_servers.mercadolibre.models import IdentifiedProduct, ScrapingResult
+        
+        real_stats = pricing_pipeline.get_price_recommendation_data
+        
+        def stats(offers):
+            if "Flip 5" in offers[0].title:
+                raise ValueError("bad price data")
+            return real_stats(offers)
+        
+        monkeypatch.setattr(pricing_pipeline, "get_price_recommendation_data", stats)
+        pipeline = pricing_pipeline.PricingPipeline()
+        
+        async def search_products(description, max_offers, force_refresh=False):
+            offers = [] if description == "JBL Charge 5" else [
+                Offer(title=f"{description} Negro", price=price, condition="new", url="",
+                      item_id=f"MLM{k}", source="jsonld")
+                for k, price in enumerate([2499.0, 2549.0, 2599.0, 2649.0, 2699.0])
+            ]
+            return ScrapingResult(
+                identified_product=IdentifiedProduct("JBL", None, None, description),
+                strategy="jsonld", listing_url="", offers=offers, timestamp=""
+            )
+        
+        monkeypatch.setattr(pipeline.scraper, "search_products", search_products)
+        results = await pipeline._analyze_descriptions(["JBL Flip 6", "JBL Flip 5", "JBL Charge 5"])
+        
+        flip6, flip5, charge5 = results
+        assert flip6["final_recommendation"] is not None
+        assert flip6["errors"] == []
+        assert flip5["final_recommendation"] is None
+        assert flip5["errors"] == ["Pipeline failure: bad price data"]
+        assert charge5["errors"] == ["No products found in scraping"]
+        
+        # A batch-wide failure is only reported on products still in flight
+        async def execute_batch(*args):
+            raise RuntimeError("pricing down")
+        
+        monkeypatch.setattr(pipeline.pricing_agent, "execute_batch", execute_batch)
+        flip6, flip5, charge5 = await pipeline._analyze_descriptions(["JBL Flip 6", "JBL Flip 5", "JBL Charge 5"])
+        
+        assert flip6["errors"] == ["Pipeline failure: pricing down"]
+        assert flip5["errors"] == ["Pipeline failure: bad price data"]
+        assert charge5["errors"] == ["No products found in scraping"]
+    
+    async def test_product_matching_excludes_accessories_and_bundles(self):
+        """Test matching drops accessories/bundles and keeps duplicate-title listings."""
+        agent = ProductMatchingAgent()
+        offers = [
+            Offer(title=title, price=price, condition="new", url="", item_id=item_id, source="jsonld")
+            for item_id, title, price in [
+                ("MLM1", "JBL Flip 6 Negro", 2499.0),
+                ("MLM2", "Funda Para JBL Flip 6", 299.0),
+                ("MLM3", "Kit JBL Flip 6 + Audífonos", 3299.0),
+                ("MLM4", "JBL Flip 6 Negro", 2599.0),
+            ]
+        ]
+        
+        result = await agent.execute("JBL Flip 6", offers)
+        
+        assert [o.item_id for o in result["comparable_offers"]] == ["MLM1", "MLM4"]
+        assert result["excluded_count"] == 2
+        assert [c["reason"] for c in result["classifications"]] == [
+            "Comparable product", "Accessory detected", "Bundle detected", "Comparable product"
+        ]
+        
+        batch = await agent.execute_batch([("JBL Flip 6", offers)])
+        assert batch[0]["comparable_offers"] == result["comparable_offers"]
+    
+    async def test_product_matching_llm_classification(self, monkeypatch):
+        """Test LLM classifications map back to offers, with heuristic fallback."""
+        from langchain_core.runnables import RunnableLambda
+        from app.agents.product_matching import BatchClassification, OfferClassification
+        from app.core.config import settings
+        
+        monkeypatch.setattr(settings, "PRODUCT_MATCHING_USE_LLM", True)
+        agent = ProductMatchingAgent()
+        offers = [
+            Offer(title=title, price=price, condition="new", url="", item_id=item_id, source="jsonld")
+            for item_id, title, price in [
+                ("MLM1", "JBL Flip 6 Negro", 2499.0),
+                ("MLM2", "JBL Flip 5 Azul", 1899.0),
+                ("MLM3", "Funda Para JBL Flip 6", 299.0),
+            ]
+        ]
+        
+        # Offer 3 is left out by the model and falls back to the heuristic
+        agent.classifier = RunnableLambda(lambda _: BatchClassification(classifications=[
+            OfferClassification(index=1, is_comparable=True, is_accessory=False,
+                                is_bundle=False, confidence=0.95, reason="Same model"),
+            OfferClassification(index=2, is_comparable=False, is_accessory=False,
+                                is_bundle=False, confidence=0.9, reason="Different model"),
+        ]))
+        result = await agent.execute("JBL Flip 6", offers)
+        
+        assert [o.item_id for o in result["comparable_offers"]] == ["MLM1"]
+        assert [c["reason"] for c in result["classifications"]] == [
+            "Same model", "Different model", "Accessory detected"
+        ]
+        
+        def fail(_):
+            raise RuntimeError("LLM unavailable")
+        
+        agent.classifier = RunnableLambda(fail)
+        batch = await agent.execute_batch([("JBL Flip 6", offers)])
+        assert [o.item_id for o in batch[0]["comparable_offers"]] == ["MLM1", "MLM2"]
@@ -121,6 +121,24 @@ class TestAnalyticsEngine:
         assert result["target_percentile"] == 75.0
         assert result["market_position"] == "premium"
         assert len(result["alternatives"]) == 3
+    
+    def test_generate_recommendation_precomputed_stats(self):
+        """Test recommendation from caller-supplied statistics matches a full run."""
+        cost = 50
+        competitors = [100, 120, 140, 160, 180, 200]
+        full = analytics_engine.calculate_stats(competitors)
+        precomputed = {
+            key: full[key]
+            for key in ("min", "max", "mean", "median", "q1", "q3", "std_dev", "sample_size")
+        }
+        
+        expected = analytics_engine.generate_recommendation(cost, competitors)
+        result = analytics_engine.generate_recommendation(
+            cost, competitors, precomputed_stats=precomputed
+        )
+        
+        for key in ("recommended_price", "target_percentile", "confidence", "market_position", "alternatives"):
+            assert result[key] == expected[key]
 
 
 @pytest.mark.asyncio
@@ -1,6 +1,8 @@
 """
 Tests for Mercado Libre MCP Server.
 """
+import json
+
 import pytest
 from unittest.mock import AsyncMock, patch, MagicMock
 from app.mcp_servers.mercadolibre import (
@@ -229,3 +231,171 @@ class TestMercadoLibreMCPTools:
             assert result["success"] is True
             assert result["requested"] == 2
             mock_batch.assert_called_once()
+
+
+class TestScraperParsing:
+    """Test suite for the listing-page parsers in the web scraper."""
+    
+    STATE = {
+        "initialState": {
+            "results": [
+                {"id": "MLM1", "title": "Bocina JBL Flip 6 \"Negra\" ñ", "price": 2499.0},
+                {"id": "MLM2", "title": "JBL Flip 6 {azul}", "price": None},
+            ]
+        }
+    }
+    
+    @staticmethod
+    def _page(state_js: str) -> str:
+        return (
+            "<html><head><script>window.__PRELOADED_STATE__ = "
+            f"{state_js};</script></head><body><script>var x = {{}};</script></body></html>"
+        )
+    
+    @pytest.mark.parametrize("use_orjson", [True, False])
+    def test_extract_preloaded_state_valid(self, use_orjson, monkeypatch):
+        """Test valid JSON state, with and without orjson."""
+        from app.mcp_servers.mercadolibre import scraper
+        
+        if not use_orjson:
+            monkeypatch.setattr(scraper, "orjson", None)
+        
+        html = self._page(json.dumps(self.STATE, ensure_ascii=False))
+        assert scraper.extract_preloaded_state(html) == self.STATE
+        
+        # More statements after the object in the same script
+        html = html.replace(";</script>", ';window.__FLAGS__ = {"a": 1};</script>', 1)
+        assert scraper.extract_preloaded_state(html) == self.STATE
+    
+    def test_extract_preloaded_state_js_literals(self):
+        """Test state with undefined values and trailing commas."""
+        from app.mcp_servers.mercadolibre.scraper import extract_preloaded_state
+        
+        state_js = (
+            '{"initialState": {"results": [{"id": "MLM1", "title": "undefined_title",'
+            ' "price": 2499.0, "seller": undefined,},], "undefinedCount": undefined,}}'
+        )
+        
+        assert extract_preloaded_state(self._page(state_js)) == {
+            "initialState": {
+                "results": [{"id": "MLM1", "title": "undefined_title", "price": 2499.0, "seller": None}],
+                "undefinedCount": None,
+            }
+        }
+    
+    def test_extract_preloaded_state_malformed(self):
+        """Test malformed or missing state returns None."""
+        from app.mcp_servers.mercadolibre.scraper import extract_preloaded_state
+        
+        assert extract_preloaded_state(self._page('{"initialState": {"results": [')) is None
+        assert extract_preloaded_state(self._page("{initialState: function() {}}")) is None
+        assert extract_preloaded_state("<html><script>var x = {};</script></html>") is None
+    
+    def test_extract_product_brand_and_model(self):
+        """Test brand plus model gives a "brand model" signature and listing URL."""
+        from app.mcp_servers.mercadolibre.scraper import extract_product, listing_url
+        
+        product = extract_product("Sony WH-1000XM5 audifonos")
+        
+        assert (product.brand, product.model, product.model_norm) == ("sony", "wh-1000xm5", "wh1000xm5")
+        assert product.signature == "sony wh-1000xm5"
+        assert listing_url(product.signature) == "https://listado.mercadolibre.com.mx/sony-wh-1000xm5"
+    
+    def test_extract_product_brand_only_keeps_description(self):
+        """Test a brand without a model keeps the description as signature."""
+        from app.mcp_servers.mercadolibre.scraper import extract_product, listing_url
+        
+        charge = extract_product("  Bocina JBL Charge  ")
+        go = extract_product("Bocina JBL Go")
+        
+        assert (charge.brand, charge.model) == ("jbl", None)
+        assert charge.signature == "Bocina JBL Charge"
+        assert listing_url(charge.signature) == "https://listado.mercadolibre.com.mx/bocina-jbl-charge"
+        # Different products of one brand get separate listings and cache entries
+        assert go.signature != charge.signature
+    
+    def test_extract_product_detects_other_brands(self):
+        """Test brands other than Sony are detected, including hyphenated ones."""
+        from app.mcp_servers.mercadolibre.scraper import extract_product
+        
+        assert extract_product("Bocina Marshall Emberton").brand == "marshall"
+        assert extract_product("Audio-Technica audifonos de estudio").brand == "audio-technica"
+        # The model match can end in a space; the signature must not
+        assert extract_product("Bose QC45 audifonos").signature == "bose qc45"
+        assert extract_product("Bocina de techo 5 pulgadas").brand is None
+    
+    def test_extract_jsonld_nodes(self):
+        """Test JSON-LD nodes with offers are found across scripts and nesting."""
+        from app.mcp_servers.mercadolibre.scraper import extract_jsonld_nodes
+        
+        product = {"@type": "Product", "name": "JBL Flip 6", "offers": {"price": 2499}}
+        item_list = {"@type": "ItemList", "itemListElement": [
+            {"item": {"name": "JBL Flip 5", "price": 1899}},
+            {"item": {"name": "Sin precio"}},
+        ]}
+        html = (
+            '<script type="application/ld+json">' + json.dumps(product) + "</script>"
+            '<script>var ld = "application/ld+json";</script>'
+            '<script type="application/ld+json">{broken</script>'
+            '<script id="ld" type="application/ld+json">' + json.dumps(item_list) + "</script>"
+        )
+        
+        assert extract_jsonld_nodes(html) == [product, {"name": "JBL Flip 5", "price": 1899}]
+
+
+@pytest.mark.asyncio
+class TestScraperCache:
+    """Test suite for the listing scrape cache."""
+    
+    @pytest.fixture
+    def fetches(self, monkeypatch):
+        """Serve a JSON-LD listing page, recording each fetched URL."""
+        from cachetools import TTLCache
+        from app.mcp_servers.mercadolibre import scraper
+        
+        nodes = [
+            {"@type": "Product", "name": f"Audifonos Sony WH-1000XM5 {color}",
+             "offers": {"price": price, "url": f"https://articulo.mercadolibre.com.mx/MLM-{k}-x"}}
+            for k, (color, price) in enumerate([("Negro", 5999.0), ("Plata", 6199.0)])
+        ]
+        html = '<script type="application/ld+json">' + json.dumps({"@graph": nodes}) + "</script>"
+        urls = []
+        
+        async def fetch_html(url, timeout):
+            urls.append(url)
+            return html
+        
+        monkeypatch.setattr(scraper, "fetch_html", fetch_html)
+        monkeypatch.setattr(scraper, "_SCRAPE_CACHE", TTLCache(maxsize=16, ttl=60))
+        return urls
+    
+    async def test_cache_hit_skips_fetch_and_returns_copy(self, fetches):
+        """Test a repeat scrape is served from the cache as an independent copy."""
+        from app.mcp_servers.mercadolibre.scraper import MLWebScraper
+        
+        scraper = MLWebScraper()
+        
+        first = await scraper.search_products("Sony WH-1000XM5")
+        assert len(first.offers) == 2
+        first.offers.clear()
+        
+        hit = await scraper.search_products("Sony WH-1000XM5")
+        assert len(fetches) == 1
+        assert hit is not first
+        assert [o.price for o in hit.offers] == [5999.0, 6199.0]
+        
+        hit.offers.pop()
+        assert len((await scraper.search_products("Sony WH-1000XM5")).offers) == 2
+        assert len(fetches) == 1
+    
+    async def test_force_refresh_bypasses_cache(self, fetches):
+        """Test force_refresh scrapes again even with a cached result."""
+        from app.mcp_servers.mercadolibre.scraper import MLWebScraper
+        
+        scraper = MLWebScraper()
+        
+        await scraper.search_products("Sony WH-1000XM5")
+        result = await scraper.search_products("Sony WH-1000XM5", force_refresh=True)
+        
+        assert len(fetches) == 2
+        assert len(result.offers) == 2